@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import savegame_editor as editor
+
+
+SAMPLE_SIZES = {
+    'small': dict(sectors=10, systems=6, pois=6, ships=10, inventory=20),
+    'medium': dict(sectors=40, systems=12, pois=10, ships=40, inventory=60),
+    'large': dict(sectors=120, systems=16, pois=14, ships=120, inventory=200),
+    'xlarge': dict(sectors=300, systems=20, pois=16, ships=300, inventory=500),
+}
+
+ITEM_TYPES = ('Weapon', 'Shield', 'Engine', 'Reactor', 'Module', 'Scanner')
+ASPECT_NAMES = ('None', 'Overcharged', 'Reinforced', 'Efficient', 'Volatile', 'Precise')
+STAT_NAMES = ('Damage', 'Range', 'FireRate', 'Capacity', 'Regen', 'Speed')
+
+
+def _sample_item(rng, name, aspect_slots=2):
+    stats = []
+    for stat in rng.sample(STAT_NAMES, rng.randint(1, 4)):
+        if rng.random() < 0.5:
+            stats.append({'stat': stat, 'multiplier': round(rng.random() + 0.5, 4)})
+        else:
+            stats.append({'stat': stat, 'amount': round(rng.random() * 1000, 2)})
+    return {
+        'displayName': name,
+        'itemType': rng.choice(ITEM_TYPES),
+        'level': rng.randint(1, 100),
+        'rarity': rng.randint(0, 5),
+        'stats': stats,
+        'aspectSlots': [{'equipAspect': rng.choice(ASPECT_NAMES), 'index': str(k)}
+                        for k in range(rng.randint(0, aspect_slots))],
+    }
+
+
+def _sample_name(rng, idx):
+    # About a third of the items are Silverheart gear, like a late-game save.
+    prefix = 'Silverheart ' if rng.random() < 0.33 else ''
+    return f'{prefix}{rng.choice(ITEM_TYPES)} Mk{idx % 7 + 1}'
+
+
+def build_sample_save(sectors=40, systems=12, pois=10, ships=40, inventory=60, seed=1):
+    rng = random.Random(seed)
+    materials = list(editor.ORE_CRYSTAL_NAMES)
+    factions = list(editor.FACTION_NAMES)
+    map_sectors = []
+    poi_guids = []
+    for s in range(sectors):
+        sector_systems = []
+        for y in range(systems):
+            points = []
+            for p in range(pois):
+                guid = f'poi-{s}-{y}-{p}'
+                poi_guids.append(guid)
+                items = [{'item': item, 'count': rng.randint(1, 5000)}
+                         for item in rng.sample(materials, rng.randint(0, 12))]
+                points.append({
+                    'guid': guid,
+                    'name': f'Station {s}-{y}-{p}',
+                    'faction': rng.choice(factions),
+                    'materialStorage': {'items': items},
+                    'description': 'x' * rng.randint(50, 400),
+                })
+            sector_systems.append({'guid': f'system-{s}-{y}', 'name': f'System {s}-{y}',
+                                   'pointsOfInterest': points})
+        map_sectors.append({'guid': f'sector-{s}', 'name': f'Zone {s}', 'systems': sector_systems})
+
+    space_ships = []
+    for i in range(ships):
+        cargo = [{'item': item, 'count': rng.randint(1, 500)}
+                 for item in rng.sample(materials, rng.randint(0, 6))]
+        cargo += [{'item': _sample_item(rng, _sample_name(rng, k)), 'count': 1}
+                  for k in range(rng.randint(0, 3))]
+        space_ships.append({
+            'guid': f'ship-{i}',
+            'type': rng.choice(('Frigate', 'Destroyer', 'Miner', 'Hauler')),
+            'customName': f'Ship {i}',
+            'equipment': {f'Slot{k}': _sample_item(rng, _sample_name(rng, k)) for k in range(8)},
+            'hardpoints': [_sample_item(rng, f'Cannon {k}') for k in range(6)],
+            'cargo': {'items': cargo},
+        })
+
+    armory = []
+    for k in range(inventory):
+        if k % 3 == 0:
+            aspect = rng.choice(ASPECT_NAMES[1:])
+            armory.append({'item': {'itemType': 'Aspect', 'aspectName': aspect,
+                                    'displayName': f'{aspect} Aspect'}, 'count': rng.randint(1, 5)})
+        else:
+            armory.append({'item': _sample_item(rng, _sample_name(rng, k)), 'count': 1})
+
+    # One entry per faction pair, not only the player's standings, as real saves do.
+    faction_data = [{'f1': f1, 'f2': f2, 'reputation': rng.randint(-5000, 15000)}
+                    for i, f1 in enumerate(factions) for f2 in factions[i + 1:]]
+
+    return {'Player': {
+        'credits': '1000000',
+        'currentPointOfInterest': rng.choice(poi_guids),
+        'currentSpaceShip': 'ship-0',
+        'factionData': faction_data,
+        'map': {'sectors': map_sectors},
+        'spaceShips': space_ships,
+        'globalInventory': {'items': armory},
+    }}
+
+
+def make_sample_save(filename, **scale):
+    data = build_sample_save(**scale)
+    with gzip.open(filename, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+
+def _first_prompt(filename, lazy):
+    # Everything main() does before showing the first menu.
+    data = editor.load_savegame(filename, lazy=lazy)
+    editor.get_player_credits(data)
+    editor.get_player_factions(data)
+    return data
+
+
+def _measure_once(filename, mode, metric):
+    lazy = mode == 'lazy'
+    if metric == 'memory':
+        tracemalloc.start()
+        data = _first_prompt(filename, lazy)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(json.dumps({'peak': peak}))
+        return
+
+    start = time.perf_counter()
+    data = _first_prompt(filename, lazy)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed}))
+
+
+def _run_child(filename, mode, metric):
+    # Each measurement runs in a fresh interpreter so peak memory and heap
+    # state from one loader never leak into the other.
+    output = subprocess.check_output(
+        [sys.executable, __file__, '_measure', mode, metric, filename])
+    return json.loads(output)
+
+
+def bench_load(filename, runs):
+    size = os.path.getsize(filename)
+    print(f"{filename}: {size / 1e6:.1f} MB compressed")
+    print(f"{'loader':<8} {'first prompt':>14} {'peak memory':>14}")
+    for mode in ('eager', 'lazy'):
+        seconds = min(_run_child(filename, mode, 'time')['seconds'] for _ in range(runs))
+        peak = _run_child(filename, mode, 'memory')['peak']
+        print(f"{mode:<8} {seconds:>13.3f}s {peak / 1e6:>12.1f}MB")
+
+
+def _apply_sample_edits(data):
+    # The same kinds of edits the menus make, through the same edit path.
+    editor.set_player_credits(data, editor.get_player_credits(data) + 1000000)
+
+    factions = editor.get_player_factions(data)
+    if factions:
+        editor.apply_edit(data, factions[0].path + ('reputation',), 15000)
+
+    materials = editor.get_material_storage(data)
+    if materials:
+        editor.set_material_amount(data, materials[0].item_ref, materials[0].count + 1, materials[0].path)
+
+    _, items = editor.find_active_ship_items(data)
+    for item_info in items:
+        stats = item_info.item.get('stats', [])
+        if stats and 'aspectSlots' in item_info.item:
+            editor.apply_edits(data, [
+                ('replace', item_info.path + ('stats', 0, editor.get_stat_value_key(stats[0])), 2.5),
+                ('add', item_info.path + ('aspectSlots', '-'), {'equipAspect': 'Sample', 'index': '1'}),
+            ])
+            break
+
+
+def bench_roundtrip(filename):
+    data = editor.load_savegame(filename, lazy=True)
+    _apply_sample_edits(data)
+
+    fd, out = tempfile.mkstemp(suffix='.save')
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        editor.save_savegame(out, data)
+        incremental_seconds = time.perf_counter() - start
+        with gzip.open(out, 'rt', encoding='utf-8') as f:
+            written = f.read()
+    finally:
+        os.remove(out)
+
+    # Full re-serialization materializes every element, so it runs last.
+    start = time.perf_counter()
+    expected = editor._encode_json(data)
+    full_seconds = time.perf_counter() - start
+
+    print(f"incremental save: {incremental_seconds:.3f}s (including gzip)")
+    print(f"full encode:      {full_seconds:.3f}s (without gzip)")
+    if written != expected:
+        print("MISMATCH: incremental output differs from a full re-serialization")
+        sys.exit(1)
+    print(f"round-trip OK ({len(written) / 1e6:.1f} MB identical)")
+
+
+def bench_compress(filename, levels, thread_counts):
+    data = editor.load_savegame(filename, lazy=True)
+    size = len(''.join(editor.iter_encoded_savegame(data)))
+    print(f"{filename}: {size / 1e6:.1f} MB uncompressed")
+    print(f"{'level':>5} {'threads':>7} {'seconds':>9} {'MB/s':>8} {'ratio':>7}")
+
+    fd, out = tempfile.mkstemp(suffix='.save')
+    os.close(fd)
+    try:
+        for level in levels:
+            for threads in thread_counts:
+                start = time.perf_counter()
+                editor.save_savegame(out, data, compresslevel=level, threads=threads)
+                elapsed = time.perf_counter() - start
+                written = os.path.getsize(out)
+                with gzip.open(out, 'rb') as f:
+                    if len(f.read()) != size:
+                        print(f"level {level} threads {threads}: output does not decompress to the save")
+                        sys.exit(1)
+                print(f"{level:>5} {threads:>7} {elapsed:>9.3f} {size / 1e6 / elapsed:>8.1f} {size / written:>7.1f}")
+    finally:
+        os.remove(out)
+
+
+def _best_of(runs, func):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def bench_codecs(filename, runs):
+    text = editor.read_save_text(filename)
+    reference = json.dumps(json.loads(text), separators=(',', ':'))
+    print(f"{filename}: {len(text) / 1e6:.1f} MB uncompressed")
+    print(f"{'backend':<9} {'parse':>8} {'serialize':>10} {'output':>20}")
+    for name in editor.JSON_BACKENDS:
+        try:
+            editor.set_json_backend(name)
+        except ImportError:
+            print(f"{name:<9} {'not installed':>8}")
+            continue
+        data, parse_seconds = _best_of(runs, lambda: editor.decode_json(text))
+        encoded, dump_seconds = _best_of(runs, lambda: editor._encode_json(data))
+        # Same bytes as the stdlib means the same key order and separators;
+        # non-ASCII names are the one place a backend may legitimately differ.
+        if encoded == reference:
+            check = 'identical'
+        elif json.loads(encoded) == json.loads(reference) and list(json.loads(encoded)) == list(data):
+            check = 'same data'
+        else:
+            check = 'MISMATCH'
+        print(f"{name:<9} {parse_seconds:>7.3f}s {dump_seconds:>9.3f}s {check:>20}")
+    editor.set_json_backend()
+
+
+def _suite_file(size, data_dir):
+    # Generated saves are kept between runs; the seed makes them identical.
+    filename = os.path.join(data_dir, f'{size}.save')
+    if not os.path.exists(filename):
+        print(f"Generating {size} save {filename}...")
+        os.makedirs(data_dir, exist_ok=True)
+        make_sample_save(filename, **SAMPLE_SIZES[size])
+    return filename
+
+
+def _cold(data, key, func):
+    # Drop the cached rows so each run rebuilds them, as the first menu visit does.
+    def run():
+        data.state.pop(key, None)
+        return func(data)
+    return run
+
+
+def _suite_timings(filename, runs):
+    seconds = {}
+    data, seconds['load_savegame'] = _best_of(runs, lambda: editor.load_savegame(filename))
+    lazy_data, seconds['load_savegame_lazy'] = _best_of(
+        runs, lambda: editor.load_savegame(filename, lazy=True))
+
+    _, seconds['get_all_stations_with_materials'] = _best_of(
+        runs, _cold(lazy_data, 'material_totals', editor.get_all_stations_with_materials))
+    _, seconds['find_silverheart_items'] = _best_of(
+        runs, _cold(lazy_data, 'item_catalog', editor.find_silverheart_items))
+    _, seconds['get_player_factions'] = _best_of(
+        runs, _cold(lazy_data, 'rows', editor.get_player_factions))
+
+    fd, out = tempfile.mkstemp(suffix='.save')
+    os.close(fd)
+    try:
+        _, seconds['save_savegame'] = _best_of(runs, lambda: editor.save_savegame(out, data))
+        _apply_sample_edits(lazy_data)
+        _, seconds['save_savegame_lazy'] = _best_of(runs, lambda: editor.save_savegame(out, lazy_data))
+    finally:
+        os.remove(out)
+    return seconds
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_suite(sizes, runs, data_dir, output, baseline):
+    results = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'json_backend': editor.get_json_backend(),
+        'runs': runs,
+        'sizes': {},
+    }
+    previous = {}
+    if baseline:
+        with open(baseline) as f:
+            previous = json.load(f).get('sizes', {})
+
+    for size in sizes:
+        filename = _suite_file(size, data_dir)
+        seconds = _suite_timings(filename, runs)
+        results['sizes'][size] = {'scale': SAMPLE_SIZES[size],
+                                  'compressed_bytes': os.path.getsize(filename),
+                                  'seconds': seconds}
+
+        print(f"{size} ({os.path.getsize(filename) / 1e6:.1f} MB compressed)")
+        old = previous.get(size, {}).get('seconds', {})
+        for name, value in seconds.items():
+            line = f"  {name:<34} {value:>9.4f}s"
+            if old.get(name):
+                change = (value - old[name]) / old[name] * 100
+                line += f" {change:>+7.1f}%"
+            print(line)
+
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+ROW_BUILDERS = (
+    ('get_material_storage', lambda data: editor.get_material_storage(data)),
+    ('get_player_factions', lambda data: editor.get_player_factions(data)),
+    ('find_silverheart_items', lambda data: editor.find_silverheart_items(data)),
+    ('find_active_ship_items', lambda data: editor.find_active_ship_items(data)[1]),
+    ('get_active_ship_cargo', lambda data: editor.get_active_ship_cargo(data)[1]),
+    ('get_armory_aspects', lambda data: editor.get_armory_aspects(data)),
+)
+
+
+def _traced_bytes(func):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, allocated
+
+
+def _as_dict_row(row):
+    # What the same row costs as the per-row dict the menus used to build.
+    fields = {name: getattr(row, name) for name in row.__slots__}
+    for name in dir(type(row)):
+        if isinstance(getattr(type(row), name), property):
+            fields[name] = getattr(row, name)
+    return fields
+
+
+def bench_rows(filename, redraws):
+    data = editor.load_savegame(filename, lazy=True)
+    print(f"{'builder':<24} {'rows':>5} {'slots B/row':>12} {'dict B/row':>11} "
+          f"{'first call':>11} {'per redraw':>11}")
+    for name, build in ROW_BUILDERS:
+        rows, first = _traced_bytes(lambda: build(data))
+        _, repeated = _traced_bytes(lambda: [build(data) for _ in range(redraws)])
+        if rows:
+            slots_size = sum(sys.getsizeof(row) for row in rows) / len(rows)
+            dict_size = sum(sys.getsizeof(_as_dict_row(row)) for row in rows) / len(rows)
+        else:
+            slots_size = dict_size = 0
+        print(f"{name:<24} {len(rows):>5} {slots_size:>12.0f} {dict_size:>11.0f} "
+              f"{first:>10}B {repeated / redraws:>10.0f}B")
+
+
+def _int_list(value):
+    return [int(part) for part in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Savegame editor benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    load = sub.add_parser('load', help="time-to-first-prompt and peak memory per loader")
+    load.add_argument('filename', nargs='?', default='bench_sample.save')
+    load.add_argument('--runs', type=int, default=3)
+
+    roundtrip = sub.add_parser('roundtrip', help="check the incremental writer against a full re-encode")
+    roundtrip.add_argument('filename', nargs='?', default='bench_sample.save')
+
+    compress = sub.add_parser('compress', help="save time per compression level and thread count")
+    compress.add_argument('filename', nargs='?', default='bench_sample.save')
+    compress.add_argument('--levels', type=_int_list, default=[1, 6, 9])
+    compress.add_argument('--threads', type=_int_list, default=sorted({1, 2, 4, os.cpu_count() or 1}))
+
+    rows = sub.add_parser('rows', help="memory per row and allocations per menu redraw")
+    rows.add_argument('filename', nargs='?', default='bench_sample.save')
+    rows.add_argument('--redraws', type=int, default=100)
+
+    codecs = sub.add_parser('codecs', help="parse and serialize time per installed JSON backend")
+    codecs.add_argument('filename', nargs='?', default='bench_sample.save')
+    codecs.add_argument('--runs', type=int, default=3)
+
+    generate = sub.add_parser('generate', help="write a synthetic save at a given scale")
+    generate.add_argument('filename')
+    generate.add_argument('--size', choices=SAMPLE_SIZES, default='medium')
+    for name in ('sectors', 'systems', 'pois', 'ships', 'inventory', 'seed'):
+        generate.add_argument(f'--{name}', type=int, help="overrides the --size preset")
+
+    suite = sub.add_parser('suite', help="time the main entry points at several save sizes")
+    suite.add_argument('--sizes', type=lambda value: value.split(','), default=['small', 'medium', 'large'])
+    suite.add_argument('--runs', type=int, default=3)
+    suite.add_argument('--data-dir', default='bench_data')
+    suite.add_argument('--output', default='bench_results.json')
+    suite.add_argument('--baseline', help="earlier results file to compare against")
+
+    measure = sub.add_parser('_measure')
+    measure.add_argument('mode')
+    measure.add_argument('metric')
+    measure.add_argument('filename')
+
+    args = parser.parse_args()
+    if args.command == '_measure':
+        _measure_once(args.filename, args.mode, args.metric)
+    elif args.command == 'generate':
+        scale = dict(SAMPLE_SIZES[args.size])
+        for name in ('sectors', 'systems', 'pois', 'ships', 'inventory', 'seed'):
+            if getattr(args, name) is not None:
+                scale[name] = getattr(args, name)
+        make_sample_save(args.filename, **scale)
+        print(f"{args.filename}: {os.path.getsize(args.filename) / 1e6:.1f} MB compressed")
+    elif args.command == 'suite':
+        unknown = [size for size in args.sizes if size not in SAMPLE_SIZES]
+        if unknown:
+            parser.error(f"unknown sizes: {', '.join(unknown)} (choose from {', '.join(SAMPLE_SIZES)})")
+        bench_suite(args.sizes, args.runs, args.data_dir, args.output, args.baseline)
+    else:
+        if not os.path.exists(args.filename):
+            print(f"Generating sample save {args.filename}...")
+            make_sample_save(args.filename)
+        if args.command == 'load':
+            bench_load(args.filename, args.runs)
+        elif args.command == 'roundtrip':
+            bench_roundtrip(args.filename)
+        elif args.command == 'compress':
+            bench_compress(args.filename, args.levels, args.threads)
+        elif args.command == 'rows':
+            bench_rows(args.filename, args.redraws)
+        elif args.command == 'codecs':
+            bench_codecs(args.filename, args.runs)
+
+
+if __name__ == '__main__':
+    main()
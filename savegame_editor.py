@@ -1,8 +1,28 @@
 #!/usr/bin/env python3
+import argparse
+import atexit
+import bisect
+import codecs
+import copy
+import fnmatch
+import gc
+import glob
+import itertools
 import gzip
+import hashlib
 import json
+import math
+import mmap
+import re
+import shutil
+import struct
 import sys
+import threading
 import os
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -108,9 +128,858 @@ ORE_CRYSTAL_NAMES = {
 }
 
 
-def load_savegame(filename):
-    with gzip.open(filename, 'rt', encoding='utf-8') as f:
-        return json.load(f)
+# Subtrees that make up the bulk of a late-game save. The lazy loader keeps
+# their elements as spans into the decompressed text and only parses an
+# element when a menu actually touches it.
+LAZY_PATHS = (
+    ('Player', 'map', 'sectors'),
+    ('Player', 'spaceShips'),
+)
+
+_UNLOADED = object()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+# Parsing and encoding go through whichever of these is installed first; the
+# stdlib json module is always there as the fallback. Every backend keeps
+# the compact (',', ':') output and the key order of the save.
+JSON_BACKENDS = ('orjson', 'ujson', 'simdjson', 'json')
+
+
+def _stdlib_loads(text):
+    return json.loads(text)
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), default=_json_default)
+
+
+# Output a faster encoder may write differently from json.dumps: raw
+# non-ASCII text, exponents without '+'/zero padding ('1e16', '1e-7') and
+# NaN/Infinity as null. Anything containing one of these is re-encoded with
+# the stdlib so saves stay byte-identical whichever backend is installed.
+_STDLIB_ONLY = re.compile(r'[^\x00-\x7f]|[0-9][eE]|null')
+
+
+def _make_json_codec(name):
+    if name == 'json':
+        return {'name': 'json', 'loads': _stdlib_loads, 'dumps': _stdlib_dumps}
+    
+    if name == 'orjson':
+        import orjson
+        
+        def dumps(obj):
+            try:
+                text = orjson.dumps(obj, default=_json_default).decode('utf-8')
+            except TypeError:
+                # Integers beyond 64 bits and other values orjson refuses.
+                return _stdlib_dumps(obj)
+            return _stdlib_dumps(obj) if _STDLIB_ONLY.search(text) else text
+        loads = orjson.loads
+    elif name == 'ujson':
+        import ujson
+        
+        def dumps(obj):
+            try:
+                text = ujson.dumps(obj, ensure_ascii=True, escape_forward_slashes=False,
+                                   default=_json_default)
+            except (TypeError, OverflowError):
+                return _stdlib_dumps(obj)
+            return _stdlib_dumps(obj) if _STDLIB_ONLY.search(text) else text
+        loads = ujson.loads
+    elif name == 'simdjson':
+        import simdjson
+        # pysimdjson only parses; encoding stays with the stdlib.
+        dumps = _stdlib_dumps
+        loads = simdjson.loads
+    else:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    
+    def safe_loads(text):
+        try:
+            return loads(text)
+        except ValueError:
+            return _stdlib_loads(text)
+    return {'name': name, 'loads': safe_loads, 'dumps': dumps}
+
+
+def set_json_backend(name=None):
+    global _json_codec
+    candidates = [name] if name else JSON_BACKENDS
+    for candidate in candidates:
+        try:
+            _json_codec = _make_json_codec(candidate)
+            return _json_codec['name']
+        except ImportError:
+            continue
+    raise ImportError(f"JSON backend {name} is not installed")
+
+
+def get_json_backend():
+    return _json_codec['name']
+
+
+def decode_json(text):
+    return _json_codec['loads'](text)
+
+
+def decode_json_span(text, start, end):
+    if _json_codec['name'] == 'json':
+        return _decoder.raw_decode(text, start)[0]
+    return _json_codec['loads'](text[start:end])
+
+
+_json_codec = _make_json_codec('json')
+try:
+    set_json_backend(os.environ.get('SAVEGAME_EDITOR_JSON') or None)
+except ImportError:
+    pass
+
+
+class LazyList:
+    def __init__(self, text, spans):
+        self._text = text
+        self._spans = spans
+        self._items = [_UNLOADED] * len(spans)
+        self._dirty = set()
+        self._canonical = None
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        item = self._items[idx]
+        if item is _UNLOADED:
+            item = self.peek(idx)
+            self._items[idx] = item
+        return item
+
+    def __iter__(self):
+        for idx in range(len(self._spans)):
+            yield self[idx]
+
+    def __repr__(self):
+        loaded = sum(1 for item in self._items if item is not _UNLOADED)
+        return f"<LazyList {loaded}/{len(self)} loaded>"
+
+    def is_loaded(self, idx):
+        return self._items[idx] is not _UNLOADED
+
+    def peek(self, idx):
+        # Parse an element without keeping it around, for read-only scans.
+        item = self._items[idx]
+        if item is not _UNLOADED:
+            return item
+        start, end = self._spans[idx]
+        return decode_json_span(self._text, start, end)
+
+    def raw(self, idx):
+        start, end = self._spans[idx]
+        return self._text[start:end]
+
+    def span(self, idx):
+        start, end = self._spans[idx]
+        return self._text, start, end
+
+    def materialize(self):
+        return list(self)
+
+    def copy(self):
+        # Shares the text and the element objects; only the lists are new.
+        clone = LazyList(self._text, list(self._spans))
+        clone._items = list(self._items)
+        clone._dirty = set(self._dirty)
+        clone._canonical = self._canonical
+        return clone
+
+    def source_size(self):
+        return len(self._text)
+
+    def loaded_index(self, item):
+        # Where this exact object was parsed into, without loading anything.
+        for idx, loaded in enumerate(self._items):
+            if loaded is item:
+                return idx
+        return None
+
+    def __setitem__(self, idx, value):
+        self._items[idx] = value
+        self.mark_dirty(idx)
+
+    def insert(self, idx, value):
+        # Inserted elements have no span in the original text; they are
+        # always dirty, so they are encoded when saved.
+        if idx < 0:
+            idx = max(0, len(self._spans) + idx)
+        idx = min(idx, len(self._spans))
+        self._spans.insert(idx, None)
+        self._items.insert(idx, value)
+        self._dirty = {i + 1 if i >= idx else i for i in self._dirty}
+        self._dirty.add(idx)
+
+    def pop(self, idx=-1):
+        value = self[idx]
+        idx %= len(self._spans)
+        del self._spans[idx]
+        del self._items[idx]
+        self._dirty = {i - 1 if i > idx else i for i in self._dirty if i != idx}
+        return value
+
+    def mark_dirty(self, idx):
+        if self._spans:
+            self._dirty.add(idx % len(self._spans))
+
+    def is_dirty(self, idx):
+        return idx in self._dirty
+
+    def is_canonical(self):
+        # Original bytes can only stand in for a re-encode when the file was
+        # written in the same compact form json.dumps produces. Checking a
+        # few clean elements is enough to tell the editor's and the game's
+        # output apart from pretty-printed or hand-edited files. The sample is
+        # decoded from the original text, never from loaded elements, so the
+        # answer does not depend on what has been loaded or changed.
+        if self._canonical is None:
+            self._canonical = all(
+                _encode_json(decode_json_span(self._text, span[0], span[1])) == self._text[span[0]:span[1]]
+                for span in [span for span in self._spans if span is not None][:3])
+        return self._canonical
+
+
+def _skip_whitespace(text, idx):
+    return _WHITESPACE.match(text, idx).end()
+
+
+def _expect(text, idx, char):
+    if text[idx:idx+1] != char:
+        raise json.JSONDecodeError(f"Expecting '{char}'", text, idx)
+    return _skip_whitespace(text, idx + 1)
+
+
+def _scan_lazy_array(text, idx, path, ctx):
+    spans = []
+    on_element = ctx['on_element']
+    idx = _expect(text, idx, '[')
+    if text[idx:idx+1] == ']':
+        return LazyList(text, spans), idx + 1
+    
+    while True:
+        # The element is parsed once to find where it ends and dropped right
+        # away, so only one element is alive at a time.
+        element, end = _decoder.raw_decode(text, idx)
+        if on_element:
+            on_element(path, len(spans), element)
+        spans.append((idx, end))
+        idx = _skip_whitespace(text, end)
+        if text[idx:idx+1] == ']':
+            return LazyList(text, spans), idx + 1
+        idx = _expect(text, idx, ',')
+
+
+def _scan_value(text, idx, path, ctx):
+    char = text[idx:idx+1]
+    if path in ctx['lazy_paths'] and char == '[':
+        return _scan_lazy_array(text, idx, path, ctx)
+    if path in ctx['lazy_prefixes'] and char == '{':
+        return _scan_object(text, idx, path, ctx)
+    return _decoder.raw_decode(text, idx)
+
+
+def _scan_object(text, idx, path, ctx):
+    obj = {}
+    idx = _expect(text, idx, '{')
+    if text[idx:idx+1] == '}':
+        return obj, idx + 1
+    
+    while True:
+        if text[idx:idx+1] != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, idx)
+        key, idx = _decoder.raw_decode(text, idx)
+        idx = _skip_whitespace(text, idx)
+        idx = _expect(text, idx, ':')
+        obj[key], idx = _scan_value(text, idx, path + (key,), ctx)
+        idx = _skip_whitespace(text, idx)
+        if text[idx:idx+1] == '}':
+            return obj, idx + 1
+        idx = _expect(text, idx, ',')
+
+
+def parse_savegame_lazy(text, lazy_paths=LAZY_PATHS, on_element=None):
+    lazy_paths = set(lazy_paths)
+    ctx = {
+        'lazy_paths': lazy_paths,
+        'lazy_prefixes': {path[:i] for path in lazy_paths for i in range(len(path))},
+        'on_element': on_element,
+    }
+    
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        idx = _skip_whitespace(text, 0)
+        data, idx = _scan_value(text, idx, (), ctx)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    
+    if _skip_whitespace(text, idx) != len(text):
+        raise json.JSONDecodeError("Extra data", text, idx)
+    return data
+
+
+class Savegame(dict):
+    # The parsed save plus per-save editor state (indexes, caches). The state
+    # lives on the object, never in the dict, so it is not written back.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.state = {}
+
+
+def _get_state(data):
+    state = getattr(data, 'state', None)
+    return state if state is not None else {}
+
+
+def _index_sector(index, sector_idx, sector):
+    if not isinstance(sector, dict):
+        return
+    zone_name = sector.get('name', 'Unknown Zone')
+    sector_path = ('Player', 'map', 'sectors', sector_idx)
+    if sector.get('guid'):
+        index[sector['guid']] = {'kind': 'sector', 'path': sector_path, 'name': zone_name,
+                                 'zone': zone_name, 'system': None}
+    
+    for system_idx, system in enumerate(sector.get('systems', [])):
+        system_name = system.get('name', 'Unknown System')
+        system_path = sector_path + ('systems', system_idx)
+        if system.get('guid'):
+            index[system['guid']] = {'kind': 'system', 'path': system_path, 'name': system_name,
+                                     'zone': zone_name, 'system': None}
+        
+        for poi_idx, poi in enumerate(system.get('pointsOfInterest', [])):
+            if poi.get('guid'):
+                index[poi['guid']] = {'kind': 'poi', 'path': system_path + ('pointsOfInterest', poi_idx),
+                                      'name': poi.get('name', 'Unknown'),
+                                      'zone': zone_name, 'system': system_name}
+
+
+def _index_ship(index, ship_idx, ship):
+    if isinstance(ship, dict) and ship.get('guid'):
+        index[ship['guid']] = {'kind': 'ship', 'path': ('Player', 'spaceShips', ship_idx),
+                               'name': ship.get('customName', ship.get('type', 'Unknown')),
+                               'zone': None, 'system': None}
+
+
+def _index_element(index, path, idx, element):
+    if path == ('Player', 'map', 'sectors'):
+        _index_sector(index, idx, element)
+    elif path == ('Player', 'spaceShips'):
+        _index_ship(index, idx, element)
+
+
+def build_guid_index(data):
+    # peek() parses lazy elements without keeping them loaded.
+    index = {}
+    for path in LAZY_PATHS:
+        node = data
+        for key in path:
+            node = node.get(key, {}) if isinstance(node, dict) else {}
+        if isinstance(node, LazyList):
+            for idx in range(len(node)):
+                _index_element(index, path, idx, node.peek(idx))
+        elif isinstance(node, list):
+            for idx, element in enumerate(node):
+                _index_element(index, path, idx, element)
+    return index
+
+
+def get_guid_index(data):
+    state = _get_state(data)
+    if 'guid_index' not in state:
+        state['guid_index'] = build_guid_index(data)
+    return state['guid_index']
+
+
+def resolve_path(data, path):
+    node = data
+    for key in path:
+        node = node[key]
+    return node
+
+
+def lookup_guid(data, guid, kind=None):
+    entry = get_guid_index(data).get(guid)
+    if entry is None or (kind and entry['kind'] != kind):
+        return None
+    try:
+        return resolve_path(data, entry['path'])
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def get_poi_location(data, guid):
+    entry = get_guid_index(data).get(guid)
+    if entry is None:
+        return None, None
+    return entry['zone'], entry['system']
+
+
+def mark_dirty(data, path):
+    path = tuple(path)
+    for lazy_path in LAZY_PATHS:
+        if path[:len(lazy_path)] == lazy_path and len(path) > len(lazy_path):
+            try:
+                node = resolve_path(data, lazy_path)
+            except (KeyError, IndexError, TypeError):
+                return
+            if isinstance(node, LazyList):
+                node.mark_dirty(path[len(lazy_path)])
+            return
+
+
+class EditLog:
+    # Every edit is a path-addressed operation recorded with the value it
+    # replaced, grouped into one transaction per user action.
+    def __init__(self):
+        self.done = []
+        self.undone = []
+
+    def record(self, label, ops):
+        self.done.append({'label': label, 'ops': ops})
+        self.undone.clear()
+
+    def operations(self):
+        return [op for transaction in self.done for op in transaction['ops']]
+
+
+def get_edit_log(data):
+    state = _get_state(data)
+    if 'edit_log' not in state:
+        state['edit_log'] = EditLog()
+    return state['edit_log']
+
+
+def _after_edit(data, path, parent, key, old, new, structural=False):
+    mark_dirty(data, path)
+    if key == 'count' and 'materialStorage' in path:
+        totals = _get_state(data).get('material_totals')
+        if totals is not None:
+            totals.update(parent, old if old is not None else 0, new if new is not None else 0)
+        columns = _get_state(data).get('material_columns')
+        if columns is not None:
+            columns.update(parent, new if new is not None else 0)
+    if 'aspectSlots' in path:
+        invalidate_item_catalog(data)
+    if structural or isinstance(old, (dict, list)) or isinstance(new, (dict, list)):
+        invalidate_derived(data, path)
+
+
+# Everything built from the save that may hold nodes or paths into it.
+_DERIVED_CACHES = ('model', 'rows', 'material_totals', 'material_columns', 'item_catalog', 'search_index')
+# Where the GUID index reads from: a structural edit along one of these
+# may move or replace indexed nodes. Integer indices are matched as '#'.
+_GUID_INDEX_PATHS = (
+    ('Player', 'map', 'sectors', '#', 'systems', '#', 'pointsOfInterest', '#'),
+    ('Player', 'spaceShips', '#'),
+)
+
+
+def invalidate_derived(data, path=()):
+    # After a container is replaced, inserted or removed, cached rows and
+    # models may point at the old node or at shifted indices.
+    state = _get_state(data)
+    for name in _DERIVED_CACHES:
+        state.pop(name, None)
+    shape = tuple('#' if isinstance(key, int) or key == '-' else key for key in path)
+    if any(indexed[:len(shape)] == shape for indexed in _GUID_INDEX_PATHS):
+        state.pop('guid_index', None)
+
+
+# Fields that say which entry a list element is, tried in order; the first
+# group the element has all of is used.
+_IDENTITY_FIELDS = (
+    (('guid',),),
+    (('item',),),
+    (('item', 'guid'),),
+    (('item', 'displayName'),),
+    (('stat',),),
+    (('f1',), ('f2',)),
+    (('index',),),
+    (('name',),),
+    (('displayName',),),
+)
+
+
+def _element_identity(element):
+    for group in _IDENTITY_FIELDS:
+        found = []
+        for fields in group:
+            node = element
+            for field in fields:
+                node = node.get(field) if isinstance(node, dict) else None
+            if not isinstance(node, (str, int)) or isinstance(node, bool):
+                break
+            found.append((fields, node))
+        else:
+            return found
+    return []
+
+
+def _edit_guards(data, path):
+    # (path, value) pairs naming every list element the edit goes through,
+    # so a replay can check it still lands on the same entries.
+    guards = []
+    node = data
+    for depth, key in enumerate(path):
+        if isinstance(node, (list, LazyList)) and isinstance(key, int):
+            if not 0 <= key < len(node):
+                break
+            node = node[key]
+            identity = _element_identity(node)
+            if identity and identity[0][0] == ('guid',):
+                # A guid pins the element wherever it is, which makes the
+                # guards of the elements above it redundant.
+                guards = []
+            guards.extend((path[:depth + 1] + fields, value) for fields, value in identity)
+        elif isinstance(node, dict) and key in node:
+            node = node[key]
+        else:
+            break
+    return guards
+
+
+def _check_test(data, path, value):
+    try:
+        actual = resolve_path(data, path)
+    except (KeyError, IndexError, TypeError):
+        raise ValueError(f"test failed: {path_to_pointer(path)} does not exist")
+    if actual != value:
+        raise ValueError(f"test failed: {path_to_pointer(path)} is {actual!r}, expected {value!r}")
+
+
+def _preserve_snapshots(data, path):
+    # Saves still being written get their own copy of what the edit at
+    # path is about to change.
+    snapshots = _get_state(data).get('snapshots')
+    if snapshots:
+        snapshots[:] = [snapshot for snapshot in snapshots if not snapshot.released]
+        for snapshot in snapshots:
+            snapshot.preserve(data, path)
+
+
+def _apply_op(data, op):
+    path = op['path']
+    _preserve_snapshots(data, path)
+    parent = resolve_path(data, path[:-1])
+    key = path[-1]
+    is_list = isinstance(parent, (list, LazyList))
+    if not (is_list or isinstance(parent, dict)):
+        raise ValueError(f"{path_to_pointer(path[:-1]) or '/'} is not an object or array")
+    if is_list and not (isinstance(key, int) or (key == '-' and op['op'] == 'add')):
+        raise ValueError(f"Invalid array index {key!r} in {path_to_pointer(path)}")
+    if op['op'] == 'add' and is_list:
+        guards = _edit_guards(data, path[:-1])
+    else:
+        guards = _edit_guards(data, path)
+    if op['op'] == 'replace':
+        old = parent[key]
+        parent[key] = op['value']
+        applied = {'op': 'replace', 'path': path, 'value': op['value'], 'old': old}
+    elif op['op'] == 'add' and is_list:
+        key = len(parent) if key == '-' else key
+        parent.insert(key, op['value'])
+        old = None
+        applied = {'op': 'add', 'path': path[:-1] + (key,), 'value': op['value'], 'old': None}
+    elif op['op'] == 'add':
+        existed = key in parent
+        old = parent.get(key)
+        parent[key] = op['value']
+        applied = {'op': 'add', 'path': path, 'value': op['value'], 'old': old, 'existed': existed}
+    else:
+        raise ValueError(f"Unsupported patch operation: {op['op']}")
+    applied['guards'] = guards
+    _after_edit(data, applied['path'], parent, key, old, op['value'], structural=op['op'] == 'add' and is_list)
+    return applied
+
+
+def _revert_op(data, op):
+    path = op['path']
+    _preserve_snapshots(data, path)
+    parent = resolve_path(data, path[:-1])
+    key = path[-1]
+    structural = op['op'] == 'add' and isinstance(parent, (list, LazyList))
+    if structural:
+        value = parent.pop(key)
+        new = None
+    elif op['op'] == 'add' and not op['existed']:
+        value = parent.pop(key)
+        new = None
+    else:
+        value = parent[key]
+        parent[key] = op['old']
+        new = op['old']
+    _after_edit(data, path, parent, key, value, new, structural)
+
+
+def apply_edits(data, edits, label='edit'):
+    # edits: (op, path, value) tuples applied as a single undoable step. If
+    # one of them fails, or a 'test' does not match, the ones before it are
+    # rolled back.
+    applied = []
+    try:
+        for op, path, value in edits:
+            if op == 'test':
+                _check_test(data, tuple(path), value)
+                continue
+            applied.append(_apply_op(data, {'op': op, 'path': tuple(path), 'value': value}))
+    except Exception:
+        for op in reversed(applied):
+            _revert_op(data, op)
+        raise
+    if applied:
+        get_edit_log(data).record(label, applied)
+    return applied
+
+
+def apply_edit(data, path, value, label='edit'):
+    return apply_edits(data, [('replace', path, value)], label)
+
+
+def undo_edit(data):
+    log = get_edit_log(data)
+    if not log.done:
+        return None
+    transaction = log.done.pop()
+    for op in reversed(transaction['ops']):
+        _revert_op(data, op)
+    log.undone.append(transaction)
+    return transaction['label']
+
+
+def redo_edit(data):
+    log = get_edit_log(data)
+    if not log.undone:
+        return None
+    transaction = log.undone.pop()
+    transaction['ops'] = [_apply_op(data, op) for op in transaction['ops']]
+    log.done.append(transaction)
+    return transaction['label']
+
+
+def _pointer_escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def path_to_pointer(path):
+    return ''.join('/' + _pointer_escape(key) for key in path)
+
+
+def pointer_to_path(data, pointer):
+    # List indices are only known to be ints by looking at the container.
+    if pointer and not pointer.startswith('/'):
+        raise ValueError(f"Invalid JSON pointer: {pointer!r}")
+    path = []
+    node = data
+    for token in pointer.split('/')[1:]:
+        key = token.replace('~1', '/').replace('~0', '~')
+        if isinstance(node, (list, LazyList)) and key != '-':
+            key = int(key)
+        path.append(key)
+        try:
+            node = node[key]
+        except (KeyError, IndexError, TypeError):
+            node = None
+    return tuple(path)
+
+
+def _is_structural_op(op):
+    # Edits after which list entries may have moved, so guards are emitted
+    # (and remembered) afresh.
+    return op['op'] == 'add' or isinstance(op['value'], (dict, list))
+
+
+def _guard_element(pointer):
+    # The element a guard 'test' names: its pointer minus the identity fields.
+    tokens = pointer.split('/')
+    for group in _IDENTITY_FIELDS:
+        for fields in group:
+            if len(tokens) > len(fields) + 1 and tuple(tokens[-len(fields):]) == fields \
+                    and tokens[-len(fields) - 1].isdigit():
+                return '/'.join(tokens[:-len(fields)])
+    return pointer
+
+
+def export_patch(data):
+    # Edits are preceded by 'test' ops on the identity (guid, item id, stat
+    # name, ...) of the list elements they go through, so replaying them on
+    # another save fails instead of landing on whatever entry now sits at
+    # that index. A test is emitted once and covers the edits after it until
+    # an edit that may move entries.
+    patch = []
+    tested = set()
+    for op in get_edit_log(data).operations():
+        for path, value in op.get('guards', ()):
+            pointer = path_to_pointer(path)
+            if (pointer, _encode_json(value)) not in tested:
+                tested.add((pointer, _encode_json(value)))
+                patch.append({'op': 'test', 'path': pointer, 'value': value})
+        if op['op'] == 'add' and isinstance(op['path'][-1], int):
+            # Appends replay as appends, wherever the list ends in the other save.
+            patch.append({'op': 'add', 'path': path_to_pointer(op['path'][:-1]) + '/-', 'value': op['value']})
+        else:
+            patch.append({'op': op['op'], 'path': path_to_pointer(op['path']), 'value': op['value']})
+        if _is_structural_op(patch[-1]):
+            tested.clear()
+    return patch
+
+
+def count_patch_edits(patch):
+    return sum(1 for op in patch if op.get('op') != 'test')
+
+
+def save_patch(filename, data):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(export_patch(data), f, indent=2)
+
+
+def load_patch(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        patch = json.load(f)
+    if not isinstance(patch, list):
+        raise ValueError(f"{filename}: a patch is a JSON list of operations")
+    return patch
+
+
+def apply_patch(data, patch, label='patch'):
+    edits = []
+    for op in patch:
+        if op.get('op') not in ('replace', 'add', 'test'):
+            raise ValueError(f"Unsupported patch operation: {op.get('op')}")
+        edits.append((op['op'], pointer_to_path(data, op['path']), op['value']))
+    return apply_edits(data, edits, label)
+
+
+def reapply_pinned(data, patch):
+    # Replays pinned edits on a freshly loaded save as one undoable step. An
+    # edit under an element whose 'test' failed (it moved or is gone) or
+    # that no longer fits the new save is skipped instead of failing the
+    # rest. Test results are kept per element, the way export_patch emits
+    # them once for the edits that follow.
+    applied = []
+    skipped = []
+    failed = {}
+    for op in patch:
+        if op.get('op') == 'test':
+            element = _guard_element(op.get('path', ''))
+            try:
+                _check_test(data, pointer_to_path(data, op['path']), op['value'])
+            except (ValueError, KeyError, TypeError) as e:
+                failed.setdefault(element, e)
+            continue
+        try:
+            tokens = op['path'].split('/')
+            for depth in range(2, len(tokens) + 1):
+                error = failed.get('/'.join(tokens[:depth]))
+                if error is not None:
+                    raise error
+            if op.get('op') not in ('replace', 'add'):
+                raise ValueError(f"Unsupported patch operation: {op.get('op')}")
+            path = pointer_to_path(data, op['path'])
+            applied.append(_apply_op(data, {'op': op['op'], 'path': path,
+                                            'value': copy.deepcopy(op['value'])}))
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            skipped.append((op, e))
+        if op.get('op') in ('replace', 'add') and _is_structural_op(op):
+            failed.clear()
+    if applied:
+        get_edit_log(data).record('pinned edits', applied)
+    return applied, skipped
+
+
+DECOMPRESSED_CACHE_DIR = os.environ.get(
+    'SAVEGAME_EDITOR_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'vg_savegame_editor'))
+DECOMPRESSED_CACHE_LIMIT = 2 << 30
+
+
+def _file_digest(filename):
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _evict_decompressed_cache(cache_dir, limit):
+    # Least recently used first: reads bump the mtime of their entry.
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.json'):
+            path = os.path.join(cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def read_save_text(filename, cache=False, cache_dir=None, cache_limit=None):
+    if not cache:
+        with gzip.open(filename, 'rb') as f:
+            return f.read().decode('utf-8')
+    
+    cache_dir = cache_dir or DECOMPRESSED_CACHE_DIR
+    cache_limit = DECOMPRESSED_CACHE_LIMIT if cache_limit is None else cache_limit
+    cached = os.path.join(cache_dir, _file_digest(filename) + '.json')
+    try:
+        with open(cached, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Decode straight out of the mapping, skipping gunzip entirely.
+            text = str(memoryview(mm), 'utf-8')
+        os.utime(cached)
+        return text
+    except (OSError, ValueError):
+        pass
+    
+    with gzip.open(filename, 'rb') as f:
+        raw = f.read()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_name = f"{cached}.{os.getpid()}.tmp"
+        with open(temp_name, 'wb') as f:
+            f.write(raw)
+        os.replace(temp_name, cached)
+        _evict_decompressed_cache(cache_dir, cache_limit)
+    except OSError:
+        pass
+    return raw.decode('utf-8')
+
+
+def load_savegame(filename, lazy=False, cache=False):
+    if not lazy:
+        if cache or get_json_backend() != 'json':
+            data = Savegame(decode_json(read_save_text(filename, cache=cache)))
+        else:
+            with gzip.open(filename, 'rt', encoding='utf-8') as f:
+                data = Savegame(json.load(f))
+        get_guid_index(data)
+        return data
+    
+    text = read_save_text(filename, cache=cache)
+    index = {}
+    data = Savegame(parse_savegame_lazy(
+        text, on_element=lambda path, idx, element: _index_element(index, path, idx, element)))
+    data.state['guid_index'] = index
+    return data
 
 
 def get_player_credits(data):
@@ -118,255 +987,2122 @@ def get_player_credits(data):
     return int(credits) if isinstance(credits, str) else credits
 
 
-def set_player_credits(data, amount):
-    data['Player']['credits'] = str(amount)
+def set_player_credits(data, amount):
+    apply_edit(data, ('Player', 'credits'), str(amount), 'credits')
+
+
+# (tier, lowest reputation of the tier), best first. Anything below the
+# last threshold is still Despised.
+REPUTATION_TIERS = (
+    ('Respected', 15000),
+    ('Friendly', 10000),
+    ('Cordial', 3500),
+    ('Neutral', 1500),
+    ('Unfriendly', -1000),
+    ('Despised', -15000),
+)
+REPUTATION_MIN = -25000
+REPUTATION_MAX = 15000
+
+
+def get_reputation_tier(reputation):
+    for tier_name, threshold in REPUTATION_TIERS[:-1]:
+        if reputation >= threshold:
+            return tier_name, threshold
+    return REPUTATION_TIERS[-1]
+
+
+# Typed views over the save. Each model wraps one raw node by path and builds
+# its children on first access, so walking player.sectors[3].systems only
+# loads the lazy elements it touches. Values are read live from the raw
+# node; edits go through apply_edit like everywhere else.
+class SaveNode:
+    __slots__ = ('data', 'path', 'parent', '_node', '_children')
+
+    def __init__(self, data, path, parent=None, node=_UNLOADED):
+        self.data = data
+        self.path = path
+        self.parent = parent
+        self._node = node
+        self._children = {}
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.path}>"
+
+    @property
+    def node(self):
+        if self._node is _UNLOADED:
+            self._node = resolve_path(self.data, self.path)
+        return self._node
+
+    def get(self, key, default=None):
+        node = self.node
+        return node.get(key, default) if isinstance(node, dict) else default
+
+    def set(self, key, value, label=None):
+        apply_edit(self.data, self.path + (key,), value, label)
+
+    def _child(self, key, build):
+        if key not in self._children:
+            self._children[key] = build()
+        return self._children[key]
+
+    def _list(self, keys, cls):
+        return self._child(keys, lambda: ModelList(self, keys, cls))
+
+
+class ModelList:
+    # Models are created per index on first access. Elements of a LazyList
+    # stay unparsed until something reads the model's node.
+    __slots__ = ('owner', 'path', 'cls', '_raw', '_models')
+
+    def __init__(self, owner, keys, cls):
+        self.owner = owner
+        self.path = owner.path + keys
+        self.cls = cls
+        node = owner.node
+        for key in keys:
+            node = node.get(key) if isinstance(node, dict) else None
+        self._raw = node if isinstance(node, (list, LazyList)) else []
+        self._models = {}
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self._raw)
+        if idx not in self._models:
+            if not 0 <= idx < len(self._raw):
+                raise IndexError(idx)
+            if isinstance(self._raw, LazyList) and not self._raw.is_loaded(idx):
+                model = self.cls(self.owner.data, self.path + (idx,), self.owner)
+            else:
+                model = self.cls(self.owner.data, self.path + (idx,), self.owner, self._raw[idx])
+            self._models[idx] = model
+        return self._models[idx]
+
+    def __iter__(self):
+        for idx in range(len(self._raw)):
+            yield self[idx]
+
+
+class Player(SaveNode):
+    __slots__ = ()
+
+    @property
+    def credits(self):
+        return get_player_credits(self.data)
+
+    @property
+    def sectors(self):
+        return self._list(('map', 'sectors'), Sector)
+
+    @property
+    def ships(self):
+        return self._list(('spaceShips',), Ship)
+
+    @property
+    def factions(self):
+        return self._list(('factionData',), FactionRelation)
+
+    @property
+    def faction_index(self):
+        # (f1, f2) in both orders -> relation, and faction -> its relations.
+        def build():
+            pairs = {}
+            by_faction = {}
+            for relation in self.factions:
+                f1, f2 = relation.f1, relation.f2
+                pairs[(f1, f2)] = pairs[(f2, f1)] = relation
+                by_faction.setdefault(f1, []).append(relation)
+                by_faction.setdefault(f2, []).append(relation)
+            return pairs, by_faction
+        return self._child('faction_index', build)
+
+    def relation(self, f1, f2):
+        return self.faction_index[0].get((f1, f2))
+
+    def relations_of(self, faction_id):
+        return self.faction_index[1].get(faction_id, [])
+
+    @property
+    def current_ship(self):
+        ship = self.find(self.get('currentSpaceShip', ''))
+        return ship if isinstance(ship, Ship) else None
+
+    @property
+    def current_poi(self):
+        poi = self.find(self.get('currentPointOfInterest', ''))
+        return poi if isinstance(poi, PointOfInterest) else None
+
+    def find(self, guid):
+        # The GUID index paths line up with the model tree, so only the
+        # sector or ship that holds the GUID gets loaded.
+        entry = get_guid_index(self.data).get(guid) if guid else None
+        if entry is None:
+            return None
+        path = entry['path']
+        try:
+            if entry['kind'] == 'ship':
+                return self.ships[path[2]]
+            model = self.sectors[path[3]]
+            for keys, depth in ((('systems',), 5), (('pointsOfInterest',), 7)):
+                if len(path) <= depth:
+                    break
+                model = model._list(keys, System if depth == 5 else PointOfInterest)[path[depth]]
+            return model
+        except (IndexError, TypeError):
+            return None
+
+
+class Sector(SaveNode):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.get('name', 'Unknown Zone')
+
+    @property
+    def guid(self):
+        return self.get('guid', '')
+
+    @property
+    def systems(self):
+        return self._list(('systems',), System)
+
+
+class System(SaveNode):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.get('name', 'Unknown System')
+
+    @property
+    def guid(self):
+        return self.get('guid', '')
+
+    @property
+    def zone(self):
+        return self.parent.name
+
+    @property
+    def pois(self):
+        return self._list(('pointsOfInterest',), PointOfInterest)
+
+
+class PointOfInterest(SaveNode):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.get('name', 'Unknown')
+
+    @property
+    def guid(self):
+        return self.get('guid', '')
+
+    @property
+    def system(self):
+        return self.parent.name
+
+    @property
+    def zone(self):
+        return self.parent.zone
+
+    @property
+    def materials(self):
+        storage = self.get('materialStorage') or {}
+        return storage.get('items', [])
+
+
+class Ship(SaveNode):
+    __slots__ = ()
+
+    @property
+    def guid(self):
+        return self.get('guid', '')
+
+    @property
+    def type(self):
+        return self.get('type', 'Unknown')
+
+    @property
+    def name(self):
+        return self.get('customName') or self.type
+
+    @property
+    def equipment(self):
+        return self._child('equipment', lambda: {
+            slot: Item(self.data, self.path + ('equipment', slot), self, item)
+            for slot, item in (self.get('equipment') or {}).items()
+            if item and isinstance(item, dict)})
+
+    @property
+    def hardpoints(self):
+        return self._list(('hardpoints',), Item)
+
+    @property
+    def cargo(self):
+        return (self.get('cargo') or {}).get('items', [])
+
+
+class Item(SaveNode):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.get('displayName', 'Unknown')
+
+    @property
+    def item_type(self):
+        return self.get('itemType', '')
+
+    @property
+    def stats(self):
+        return self.get('stats', [])
+
+    @property
+    def aspects(self):
+        return get_item_aspects(self.node)
+
+
+class FactionRelation(SaveNode):
+    __slots__ = ()
+
+    @property
+    def f1(self):
+        return self.get('f1')
+
+    @property
+    def f2(self):
+        return self.get('f2')
+
+    @property
+    def reputation(self):
+        return self.get('reputation', 0)
+
+    def set_reputation(self, value, label=None):
+        self.set('reputation', int(value), label or 'reputation')
+
+    def other(self, faction_id):
+        if self.f2 == faction_id:
+            return self.f1
+        if self.f1 == faction_id:
+            return self.f2
+        return None
+
+
+def get_player(data):
+    state = _get_state(data)
+    if 'model' not in state:
+        state['model'] = Player(data, ('Player',), node=data.get('Player', {}))
+    return state['model']
+
+
+# Row views handed to the menus. Each one points at its node in the save and
+# reads values like counts and reputations live, so the same rows are reused
+# across redraws instead of rebuilding a dict per row every loop.
+class MaterialRow:
+    __slots__ = ('item_id', 'name', 'item_ref', 'path')
+
+    def __init__(self, item_id, item_ref, path):
+        self.item_id = item_id
+        self.name = ORE_CRYSTAL_NAMES.get(item_id, item_id)
+        self.item_ref = item_ref
+        self.path = path
+
+    @property
+    def count(self):
+        return self.item_ref.get('count', 0)
+
+
+class FactionRow:
+    __slots__ = ('faction', 'faction_id', 'entry', 'path')
+
+    def __init__(self, faction_id, entry, path):
+        self.faction = FACTION_NAMES.get(faction_id, faction_id)
+        self.faction_id = faction_id
+        self.entry = entry
+        self.path = path
+
+    @property
+    def reputation(self):
+        return self.entry.get('reputation', 0)
+
+    @property
+    def tier(self):
+        return get_reputation_tier(self.reputation)[0]
+
+    @property
+    def tier_min(self):
+        return get_reputation_tier(self.reputation)[1]
+
+
+class ItemRow:
+    __slots__ = ('location', 'slot', 'item', 'path', 'kind', 'ship_idx')
+
+    def __init__(self, location, slot, item, path, kind=None, ship_idx=None):
+        self.location = location
+        self.slot = slot
+        self.item = item
+        self.path = path
+        self.kind = kind
+        self.ship_idx = ship_idx
+
+    @property
+    def name(self):
+        return self.item.get('displayName', 'Unknown')
+
+
+class CargoRow:
+    __slots__ = ('cargo_idx', 'entry', 'path')
+
+    def __init__(self, cargo_idx, entry, path):
+        self.cargo_idx = cargo_idx
+        self.entry = entry
+        self.path = path
+
+    @property
+    def item(self):
+        return self.entry.get('item')
+
+    @property
+    def is_simple(self):
+        return not isinstance(self.item, dict)
+
+    @property
+    def count(self):
+        return self.entry.get('count', 1)
+
+    @property
+    def item_name(self):
+        item = self.item
+        return item.get('displayName', 'Unknown') if isinstance(item, dict) else str(item)
+
+    @property
+    def name(self):
+        aspects = get_item_aspects(self.item)
+        if aspects:
+            return f"{self.item_name} (x{self.count}) [{', '.join(aspects)}]"
+        return f"{self.item_name} (x{self.count})"
+
+
+class AspectRow:
+    __slots__ = ('aspect_name', 'display_name', 'entry', 'armory_idx', 'path')
+
+    def __init__(self, entry, armory_idx, path):
+        item = entry['item']
+        self.aspect_name = item.get('aspectName', 'Unknown')
+        self.display_name = item.get('displayName', 'Unknown')
+        self.entry = entry
+        self.armory_idx = armory_idx
+        self.path = path
+
+    @property
+    def count(self):
+        return self.entry.get('count', 1)
+
+
+def _cached_rows(data, key, build):
+    rows = _get_state(data).setdefault('rows', {})
+    if key not in rows:
+        rows[key] = build()
+    return rows[key]
+
+
+def invalidate_rows(data):
+    _get_state(data).pop('rows', None)
+
+
+def get_current_poi_material_storage(data):
+    poi = get_player(data).current_poi
+    if poi is None:
+        return None
+    return poi.get('materialStorage', {})
+
+
+def get_material_storage(data):
+    current_poi = data.get('Player', {}).get('currentPointOfInterest', '')
+    return _cached_rows(data, ('materials', current_poi), lambda: _build_material_rows(data))
+
+
+def _build_material_rows(data):
+    storage = get_current_poi_material_storage(data)
+    if not storage:
+        return []
+    
+    current_poi = data['Player']['currentPointOfInterest']
+    items_path = get_guid_index(data)[current_poi]['path'] + ('materialStorage', 'items')
+    return [MaterialRow(item.get('item', ''), item, items_path + (idx,))
+            for idx, item in enumerate(storage.get('items', []))]
+
+
+class MaterialTotals:
+    # Material counts summed per station, system, zone and galaxy-wide in a
+    # single pass over the map, then kept current by set_material_amount.
+    def __init__(self, data):
+        self.stations = []
+        self.by_system = {}
+        self.by_zone = {}
+        self.galaxy = {}
+        self.locations = {}
+        self.names = {}
+        self._owners = {}
+        
+        for sector in get_player(data).sectors:
+            zone_name = sector.name
+            for system in sector.systems:
+                system_name = system.name
+                
+                for poi in system.pois:
+                    items = poi.materials
+                    if not items:
+                        continue
+                    
+                    station = {
+                        'name': poi.name,
+                        'guid': poi.guid,
+                        'system': system_name,
+                        'zone': zone_name,
+                        'items': items,
+                        'poi_ref': poi.node,
+                        'path': poi.path,
+                        'totals': {}
+                    }
+                    self.stations.append(station)
+                    for item in items:
+                        if item and isinstance(item, dict):
+                            self._owners[id(item)] = station
+                            self._add(station, item.get('item', ''), item.get('count', 0))
+        
+        self.stations.sort(key=lambda s: (s['zone'], s['system'], s['name']))
+    
+    def _add(self, station, item_id, delta):
+        if item_id not in self.names:
+            self.names[item_id] = ORE_CRYSTAL_NAMES.get(item_id, item_id)
+        for totals in (station['totals'],
+                       self.by_system.setdefault((station['zone'], station['system']), {}),
+                       self.by_zone.setdefault(station['zone'], {}),
+                       self.galaxy):
+            totals[item_id] = totals.get(item_id, 0) + delta
+        stations = self.locations.setdefault(item_id, {})
+        stations[id(station)] = station
+    
+    def update(self, item_ref, old_count, new_count):
+        station = self._owners.get(id(item_ref))
+        if station is not None and new_count != old_count:
+            self._add(station, item_ref.get('item', ''), new_count - old_count)
+    
+    def resolve_item_ids(self, name):
+        lowered = name.strip().lower()
+        exact = [item_id for item_id, display_name in self.names.items()
+                 if lowered in (item_id.lower(), display_name.lower())]
+        if exact:
+            return exact
+        return [item_id for item_id, display_name in self.names.items()
+                if lowered in display_name.lower()]
+    
+    def where(self, item_id):
+        stations = [(station, station['totals'].get(item_id, 0))
+                    for station in self.locations.get(item_id, {}).values()]
+        return sorted([entry for entry in stations if entry[1]], key=lambda entry: -entry[1])
+
+
+def get_material_totals(data):
+    state = _get_state(data)
+    if 'material_totals' not in state:
+        state['material_totals'] = MaterialTotals(data)
+    return state['material_totals']
+
+
+def get_all_stations_with_materials(data):
+    return get_material_totals(data).stations
+
+
+def set_material_amount(data, item_ref, amount, path):
+    # Goes through apply_edit so the lazy element is marked dirty and the
+    # totals and columns are updated by _after_edit.
+    apply_edit(data, tuple(path) + ('count',), int(amount), 'material')
+
+
+class MaterialColumns:
+    # Every station material entry as one row of parallel columns. Counts
+    # live in an int64 array and rows are grouped by material, so a bulk
+    # rule only visits the rows of the materials it matches.
+    def __init__(self, totals):
+        self.item_ids = []
+        self.names = []
+        self.stations = []
+        self.entries = []
+        self.paths = []
+        self.codes = array('l')
+        self.counts = array('q')
+        self.rows_by_item = {}
+        self._rows = {}
+        self._row_views = {}
+        codes = {}
+        
+        for station in totals.stations:
+            items_path = station['path'] + ('materialStorage', 'items')
+            for idx, entry in enumerate(station['items']):
+                if not (entry and isinstance(entry, dict)):
+                    continue
+                item_id = entry.get('item', '')
+                if item_id not in codes:
+                    codes[item_id] = len(self.item_ids)
+                    self.item_ids.append(item_id)
+                    self.names.append(ORE_CRYSTAL_NAMES.get(item_id, item_id))
+                    self.rows_by_item[codes[item_id]] = array('l')
+                row = len(self.entries)
+                self.rows_by_item[codes[item_id]].append(row)
+                self.stations.append(station)
+                self.entries.append(entry)
+                self.paths.append(items_path + (idx,))
+                self.codes.append(codes[item_id])
+                self.counts.append(entry.get('count', 0))
+                self._rows[id(entry)] = row
+    
+    def material_row(self, row):
+        # MaterialRow views are only built for rows a menu actually shows.
+        view = self._row_views.get(row)
+        if view is None:
+            view = self._row_views[row] = MaterialRow(self.item_ids[self.codes[row]],
+                                                      self.entries[row], self.paths[row])
+        return view
+    
+    def update(self, entry, count):
+        row = self._rows.get(id(entry))
+        if row is not None:
+            self.counts[row] = count
+    
+    def match(self, pattern):
+        # Shell-style and case-insensitive, on the item id or the display name.
+        pattern = pattern.strip().lower()
+        return [code for code, item_id in enumerate(self.item_ids)
+                if fnmatch.fnmatchcase(item_id.lower(), pattern)
+                or fnmatch.fnmatchcase(self.names[code].lower(), pattern)]
+    
+    def plan(self, pattern, action, value):
+        counts = self.counts
+        changes = []
+        for code in self.match(pattern):
+            rows = self.rows_by_item[code]
+            if action == 'set':
+                new_counts = [int(value)] * len(rows)
+            elif action == 'scale':
+                new_counts = [max(1, round(counts[row] * value)) for row in rows]
+            elif action == 'fill':
+                new_counts = [max(counts[row], int(value)) for row in rows]
+            else:
+                raise ValueError(f"Unknown bulk action: {action}")
+            changes.extend((row, counts[row], new) for row, new in zip(rows, new_counts)
+                           if new != counts[row])
+        changes.sort(key=lambda change: change[0])
+        return changes
+
+
+def get_material_columns(data):
+    state = _get_state(data)
+    if 'material_columns' not in state:
+        state['material_columns'] = MaterialColumns(get_material_totals(data))
+    return state['material_columns']
+
+
+BULK_MATERIAL_ACTIONS = {
+    'set': "set to",
+    'scale': "multiply by",
+    'fill': "fill up to",
+}
+
+
+def plan_bulk_material_edit(data, pattern, action, value):
+    columns = get_material_columns(data)
+    return columns, columns.plan(pattern, action, value)
+
+
+def apply_bulk_material_edit(data, pattern, action, value):
+    columns, changes = plan_bulk_material_edit(data, pattern, action, value)
+    if changes:
+        apply_edits(data, [('replace', columns.paths[row] + ('count',), new) for row, _, new in changes],
+                    f"bulk {action} {pattern}")
+    return changes
+
+
+def get_player_factions(data):
+    return _cached_rows(data, 'factions', lambda: _build_faction_rows(data))
+
+
+def _build_faction_rows(data):
+    player_factions = []
+    
+    for relation in get_player(data).relations_of('Player'):
+        faction_id = relation.other('Player')
+        if faction_id:
+            player_factions.append(FactionRow(faction_id, relation.node, relation.path))
+    
+    return player_factions
+
+
+BULK_REPUTATION_SCOPES = {
+    'player': "the player's standings",
+    'others': "standings between other factions",
+    'all': "every faction pair",
+}
+
+
+def _bulk_reputation_relations(data, scope):
+    player = get_player(data)
+    if scope == 'player':
+        return player.relations_of('Player')
+    if scope == 'others':
+        return [relation for relation in player.factions if relation.other('Player') is None]
+    if scope == 'all':
+        return list(player.factions)
+    # A single faction id: all of its pairs.
+    return player.relations_of(scope)
+
+
+def plan_bulk_reputation(data, scope, action, value):
+    # action 'tier' takes a tier name, 'clamp' a (low, high) pair and
+    # 'delta' an amount; results always stay within the game's range.
+    if action == 'tier':
+        thresholds = dict(REPUTATION_TIERS)
+        if value not in thresholds:
+            raise ValueError(f"Unknown tier: {value}")
+        target = thresholds[value]
+        compute = lambda rep: target
+    elif action == 'clamp':
+        low, high = value
+        compute = lambda rep: min(max(rep, low), high)
+    elif action == 'delta':
+        compute = lambda rep: rep + value
+    else:
+        raise ValueError(f"Unknown bulk action: {action}")
+    
+    changes = []
+    for relation in _bulk_reputation_relations(data, scope):
+        old = relation.reputation
+        new = min(max(int(compute(old)), REPUTATION_MIN), REPUTATION_MAX)
+        if new != old:
+            changes.append((relation, old, new))
+    return changes
+
+
+def apply_bulk_reputation(data, scope, action, value):
+    changes = plan_bulk_reputation(data, scope, action, value)
+    if changes:
+        apply_edits(data, [('replace', relation.path + ('reputation',), new)
+                           for relation, _, new in changes], f"bulk reputation {action}")
+    return changes
+
+
+def _relation_label(relation):
+    faction_id = relation.other('Player')
+    if faction_id is not None:
+        return FACTION_NAMES.get(faction_id, faction_id)
+    return f"{FACTION_NAMES.get(relation.f1, relation.f1)} / {FACTION_NAMES.get(relation.f2, relation.f2)}"
+
+
+def bulk_factions_menu(data):
+    scope = {'p': 'player', 'o': 'others', 'a': 'all'}.get(
+        input("\n[p/P] Player standings | [o/O] Between other factions | [a/A] All pairs: ").strip().lower())
+    if scope is None:
+        return
+    action = {'t': 'tier', 'c': 'clamp', 'd': 'delta'}.get(
+        input("[t/T] Set to tier | [c/C] Clamp to range | [d/D] Add delta: ").strip().lower())
+    if action is None:
+        return
+    
+    try:
+        if action == 'tier':
+            print(', '.join(f"{idx+1}. {tier} ({threshold:,})"
+                            for idx, (tier, threshold) in enumerate(REPUTATION_TIERS)))
+            value = REPUTATION_TIERS[int(input("Tier: ").strip()) - 1][0]
+        elif action == 'clamp':
+            low = int(input(f"Lowest (min {REPUTATION_MIN}): ").strip())
+            high = int(input(f"Highest (max {REPUTATION_MAX}): ").strip())
+            if low > high:
+                print("Lowest must not be above highest.")
+                return
+            value = (low, high)
+        else:
+            value = int(input("Delta (e.g. 2500 or -1000): ").strip())
+    except (ValueError, IndexError):
+        print("Invalid input.")
+        return
+    
+    changes = plan_bulk_reputation(data, scope, action, value)
+    if not changes:
+        print("Nothing to change.")
+        return
+    
+    print(f"\n{len(changes)} reputation(s) in {BULK_REPUTATION_SCOPES[scope]} will change:")
+    for relation, old, new in changes[:20]:
+        print(f"  {_relation_label(relation)}: {old:,} ({get_reputation_tier(old)[0]}) -> "
+              f"{new:,} ({get_reputation_tier(new)[0]})")
+    if len(changes) > 20:
+        print(f"  ... and {len(changes) - 20} more")
+    
+    if input("Apply? [y/N]: ").strip().lower() == 'y':
+        apply_bulk_reputation(data, scope, action, value)
+        print(f"Updated {len(changes)} reputation(s). Undo with [u] in the main menu.")
+
+
+def edit_faction_reputation(data, faction_entry, path):
+    current_rep = faction_entry.get('reputation', 0)
+    faction_name = faction_entry.get('f1', 'Unknown')
+    
+    while True:
+        new_value = input(f"Enter new reputation for {faction_name} (current: {current_rep}, range: {REPUTATION_MIN} to {REPUTATION_MAX}): ").strip()
+        if not new_value:
+            return
+        
+        try:
+            new_rep = int(new_value)
+            if REPUTATION_MIN <= new_rep <= REPUTATION_MAX:
+                apply_edit(data, tuple(path) + ('reputation',), new_rep, 'reputation')
+                tier_name, _ = get_reputation_tier(new_rep)
+                print(f"Updated {faction_name} to {new_rep:,} - {tier_name}")
+                return
+            else:
+                print(f"Value must be between {REPUTATION_MIN} and {REPUTATION_MAX}.")
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+
+
+def edit_factions_menu(data, factions):
+    while True:
+        print("\nPlayer Faction Reputations:")
+        for idx, faction in enumerate(factions):
+            print(f"  {idx+1}. {faction.faction}: {faction.reputation:,} - {faction.tier}")
+        
+        print(f"\n[1-{len(factions)}] Select faction to edit | [b/B] Bulk edit | [z/Z] Back")
+        choice = input("Choice: ").strip().lower()
+        
+        if choice == 'z':
+            break
+        if choice == 'b':
+            bulk_factions_menu(data)
+            continue
+        
+        try:
+            faction_idx = int(choice) - 1
+            if 0 <= faction_idx < len(factions):
+                edit_faction_reputation(data, factions[faction_idx].entry, factions[faction_idx].path)
+            else:
+                print("Invalid selection.")
+        except ValueError:
+            print("Invalid input.")
+
+
+def list_save_files(directory='.'):
+    save_files = []
+    for file in Path(directory).glob('*.save'):
+        if file.is_file():
+            stat = file.stat()
+            save_files.append({'path': file, 'name': file.name, 'mtime': stat.st_mtime,
+                               'size': stat.st_size})
+    save_files.sort(key=lambda x: x['mtime'], reverse=True)
+    return save_files
+
+
+WATCH_INTERVAL = 0.5
+WATCH_ATTEMPTS = 20
+
+
+class SaveReload:
+    def __init__(self, filename, mtime, seen_at):
+        self.filename = filename
+        self.mtime = mtime
+        self.seen_at = seen_at
+        self.data = None
+        self.error = None
+        self.attempts = 0
+        self.parse_seconds = 0.0
+        self.pinned = []
+        self.applied = []
+        self.skipped = []
+        self.ready_at = None
+    
+    def summary(self):
+        text = (f"Loaded {os.path.basename(self.filename)}, ready {self.ready_at - self.mtime:.2f}s after it appeared "
+                f"(noticed after {self.seen_at - self.mtime:.2f}s, parsed in {self.parse_seconds:.2f}s")
+        if self.attempts > 1:
+            text += f", {self.attempts} attempts"
+        text += f"); reapplied {len(self.applied)} pinned edit(s)"
+        if self.skipped:
+            text += f", skipped {len(self.skipped)} that no longer fit"
+        return text
+
+
+class SaveWatcher:
+    # Polls a directory for saves the game writes and loads the newest one
+    # lazily on a background thread, with the pinned edits reapplied, so it
+    # is ready to swap in by the next prompt. Saves written by the editor
+    # itself are ignored.
+    def __init__(self, directory, pinned=(), interval=WATCH_INTERVAL, attempts=WATCH_ATTEMPTS):
+        self.directory = directory
+        self.pinned = list(pinned)
+        self.interval = interval
+        self.attempts = attempts
+        self._writing = set()
+        self._written = {}
+        self._ready = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._seen = self._newest()
+        self._thread = threading.Thread(target=self._run, name="save watcher", daemon=True)
+        self._thread.start()
+    
+    def _newest(self):
+        for save in list_save_files(self.directory):
+            path = os.path.realpath(save['path'])
+            if path in self._writing or self._written.get(path) == (save['mtime'], save['size']):
+                continue
+            return path, save['mtime'], save['size']
+        return None
+    
+    def saving(self, filename):
+        self._writing.add(os.path.realpath(filename))
+    
+    def saved(self, filename):
+        path = os.path.realpath(filename)
+        try:
+            stat = os.stat(path)
+            self._written[path] = (stat.st_mtime, stat.st_size)
+        except OSError:
+            pass
+        self._writing.discard(path)
+    
+    def take(self):
+        with self._lock:
+            reload, self._ready = self._ready, None
+        return reload
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                newest = self._newest()
+            except OSError:
+                continue
+            if newest is None or newest == self._seen:
+                continue
+            try:
+                reload = self._load(newest)
+            except Exception as e:
+                # Report it and keep watching; the thread must not die.
+                self._seen = newest
+                reload = SaveReload(newest[0], newest[1], time.time())
+                reload.error = e
+            if reload is None:
+                continue
+            with self._lock:
+                self._ready = reload
+            if reload.error is None:
+                print(f"\n[watch] {os.path.basename(reload.filename)} is ready; press Enter to switch to it.")
+            else:
+                print(f"\n[watch] Could not load {os.path.basename(reload.filename)}: {reload.error}")
+    
+    def _load(self, signature):
+        path, mtime, size = signature
+        reload = SaveReload(path, mtime, time.time())
+        while not self._stop.is_set():
+            reload.attempts += 1
+            start = time.perf_counter()
+            try:
+                data = load_savegame(path, lazy=True)
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return None
+            except (OSError, EOFError, zlib.error, ValueError) as e:
+                # Most likely the game is still writing it.
+                data = None
+                reload.error = e
+            else:
+                if (stat.st_mtime, stat.st_size) == (mtime, size):
+                    reload.parse_seconds = time.perf_counter() - start
+                    break
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            if (stat.st_mtime, stat.st_size) != (mtime, size):
+                mtime, size = stat.st_mtime, stat.st_size
+                reload.attempts = 0
+            elif reload.attempts >= self.attempts:
+                self._seen = path, mtime, size
+                return reload
+            self._stop.wait(self.interval)
+        else:
+            return None
+        self._seen = path, mtime, size
+        reload.error = None
+        reload.data = data
+        reload.pinned = self.pinned
+        reload.applied, reload.skipped = reapply_pinned(data, reload.pinned)
+        reload.ready_at = time.time()
+        return reload
+
+
+METADATA_CACHE_NAME = '.savegame_editor_cache.json'
+HEADER_FIELDS = ('credits', 'currentSpaceShip', 'currentPointOfInterest', 'factionData')
+HEADER_READ_LIMIT = 64 << 20
+
+
+# A resumable walk over the Player object of a partly decompressed save.
+# The helpers are generators that yield whenever they run off the end of
+# buf['text'], and carry on from the same spot once more text is appended.
+def _stream_skip(buf, idx):
+    while True:
+        idx = _skip_whitespace(buf['text'], idx)
+        if idx < len(buf['text']):
+            return idx
+        yield
+
+
+def _stream_value(buf, idx):
+    idx = yield from _stream_skip(buf, idx)
+    while True:
+        try:
+            value, end = _decoder.raw_decode(buf['text'], idx)
+            # A number cut at the end of the text still decodes.
+            if end < len(buf['text']):
+                return value, end
+        except json.JSONDecodeError:
+            pass
+        yield
+
+
+def _stream_container(buf, idx, is_object, on_member):
+    idx = yield from _stream_skip(buf, idx)
+    if buf['text'][idx] != ('{' if is_object else '['):
+        raise ValueError(f"unexpected {buf['text'][idx]!r} at {idx}")
+    idx = yield from _stream_skip(buf, idx + 1)
+    if buf['text'][idx] in '}]':
+        return idx + 1
+    while True:
+        if is_object:
+            key, idx = yield from _stream_value(buf, idx)
+            idx = yield from _stream_skip(buf, idx)
+            idx = yield from on_member(key, idx + 1)
+        else:
+            idx = yield from on_member(None, idx)
+        idx = yield from _stream_skip(buf, idx)
+        if buf['text'][idx] in '}]':
+            return idx + 1
+        idx += 1
+
 
+def _walk_save_header(buf, found):
+    # Stops as soon as the header fields are in; other values are skipped.
+    def skip(key, idx):
+        _, end = yield from _stream_value(buf, idx)
+        return end
+    
+    def player_member(key, idx):
+        if key in HEADER_FIELDS:
+            found[key], end = yield from _stream_value(buf, idx)
+            return end
+        return (yield from skip(key, idx))
+    
+    def top_member(key, idx):
+        if key == 'Player':
+            return (yield from _stream_container(buf, idx, True, player_member))
+        return (yield from skip(key, idx))
+    
+    yield from _stream_container(buf, 0, True, top_member)
 
-def get_reputation_tier(reputation):
-    if reputation >= 15000:
-        return "Respected", 15000
-    elif reputation >= 10000:
-        return "Friendly", 10000
-    elif reputation >= 3500:
-        return "Cordial", 3500
-    elif reputation >= 1500:
-        return "Neutral", 1500
-    elif reputation >= -1000:
-        return "Unfriendly", -1000
-    else:
-        return "Despised", -15000
 
+NAME_LOOKBACK = 1 << 16
 
-def get_current_poi_material_storage(data):
-    current_poi = data.get('Player', {}).get('currentPointOfInterest', '')
-    if not current_poi:
+
+def _find_named_object(text, guid, search_from=0):
+    # A targeted lookup instead of a parse: find '"guid": <guid>' and decode
+    # only the innermost object around it that has that guid.
+    match = re.compile(r'"guid"\s*:\s*' + re.escape(json.dumps(guid))).search(text, search_from)
+    if match is None:
         return None
-    
-    map_data = data.get('Player', {}).get('map', {})
-    sectors = map_data.get('sectors', [])
-    
-    for sector in sectors:
-        for system in sector.get('systems', []):
-            for poi in system.get('pointsOfInterest', []):
-                if poi.get('guid') == current_poi:
-                    return poi.get('materialStorage', {})
-    return None
+    idx = match.start()
+    while True:
+        idx = text.rfind('{', 0, idx)
+        if idx < 0 or match.start() - idx > NAME_LOOKBACK:
+            return None
+        try:
+            value, end = _decoder.raw_decode(text, idx)
+        except json.JSONDecodeError:
+            continue
+        if end > match.start() and isinstance(value, dict) and value.get('guid') == guid:
+            return value
 
 
-def get_material_storage(data):
-    storage = get_current_poi_material_storage(data)
-    if not storage:
-        return []
+def read_save_header(filename, limit=HEADER_READ_LIMIT):
+    # Decompress only as far as needed to see the Player header fields,
+    # instead of gunzipping and parsing the whole save. Only the Player
+    # object's own keys count. The current ship and POI are then named by a
+    # targeted search for their guids in the rest of the stream.
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = {'text': ''}
+    found = {}
+    walk = _walk_save_header(buf, found)
+    names = {}
     
-    materials = []
-    for item in storage.get('items', []):
-        item_id = item.get('item', '')
-        count = item.get('count', 0)
-        display_name = ORE_CRYSTAL_NAMES.get(item_id, item_id)
-        materials.append({
-            'item_id': item_id,
-            'name': display_name,
-            'count': count,
-            'item_ref': item
-        })
-    return materials
+    with open(filename, 'rb') as f:
+        def read_more(size=1 << 16):
+            chunk = f.read(size)
+            if not chunk:
+                return False
+            buf['text'] += decoder.decode(decompressor.decompress(chunk))
+            return True
+        
+        while len(found) < len(HEADER_FIELDS) and len(buf['text']) < limit:
+            try:
+                next(walk)
+            except (StopIteration, ValueError):
+                break
+            if not read_more():
+                break
+        
+        wanted = {'currentSpaceShipName': found.get('currentSpaceShip'),
+                  'currentPointOfInterestName': found.get('currentPointOfInterest')}
+        wanted = {field: guid for field, guid in wanted.items() if isinstance(guid, str) and guid}
+        search_from = 0
+        while True:
+            for field, guid in list(wanted.items()):
+                obj = _find_named_object(buf['text'], guid, search_from)
+                if obj is not None:
+                    names[field] = obj.get('customName') or obj.get('type') or obj.get('name')
+                    del wanted[field]
+            # An object cut at the end of the text is found again next round.
+            search_from = max(0, len(buf['text']) - NAME_LOOKBACK)
+            if not wanted or len(buf['text']) >= limit or not read_more(1 << 20):
+                break
+    found.update(names)
+    return found
 
 
-def get_all_stations_with_materials(data):
-    map_data = data.get('Player', {}).get('map', {})
-    sectors = map_data.get('sectors', [])
-    stations = []
-    
-    for sector in sectors:
-        zone_name = sector.get('name', 'Unknown Zone')
-        for system in sector.get('systems', []):
-            system_name = system.get('name', 'Unknown System')
-            
-            for poi in system.get('pointsOfInterest', []):
-                poi_name = poi.get('name', 'Unknown')
-                poi_guid = poi.get('guid', '')
-                material_storage = poi.get('materialStorage', {})
-                items = material_storage.get('items', [])
-                
-                if items:
-                    stations.append({
-                        'name': poi_name,
-                        'guid': poi_guid,
-                        'system': system_name,
-                        'zone': zone_name,
-                        'items': items,
-                        'poi_ref': poi
-                    })
-    
-    stations.sort(key=lambda s: (s['zone'], s['system'], s['name']))
-    return stations
+def summarize_save_header(header):
+    credits = header.get('credits', 0)
+    tiers = {}
+    for entry in header.get('factionData', []) or []:
+        if isinstance(entry, dict) and 'Player' in (entry.get('f1'), entry.get('f2')):
+            tier_name, _ = get_reputation_tier(entry.get('reputation', 0))
+            tiers[tier_name] = tiers.get(tier_name, 0) + 1
+    return {
+        'credits': int(credits) if isinstance(credits, str) and credits.lstrip('-').isdigit() else credits,
+        'ship': header.get('currentSpaceShip', ''),
+        'ship_name': header.get('currentSpaceShipName'),
+        'poi': header.get('currentPointOfInterest', ''),
+        'poi_name': header.get('currentPointOfInterestName'),
+        'tiers': tiers,
+    }
 
 
-def set_material_amount(data, item_ref, amount):
-    item_ref['count'] = int(amount)
+def _load_metadata_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
 
 
-def get_player_factions(data):
-    faction_data = data.get('Player', {}).get('factionData', [])
-    player_factions = []
+def get_save_metadata(save_files, directory='.'):
+    cache_path = os.path.join(directory, METADATA_CACHE_NAME)
+    cache = _load_metadata_cache(cache_path)
+    fresh = {}
     
-    for entry in faction_data:
-        faction_id = None
-        
-        if entry.get('f2') == 'Player':
-            faction_id = entry.get('f1')
-        elif entry.get('f1') == 'Player':
-            faction_id = entry.get('f2')
-        
-        if faction_id:
-            rep = entry.get('reputation', 0)
-            tier_name, tier_min = get_reputation_tier(rep)
-            faction_display_name = FACTION_NAMES.get(faction_id, faction_id)
-            player_factions.append({
-                'faction': faction_display_name,
-                'faction_id': faction_id,
-                'reputation': rep,
-                'tier': tier_name,
-                'tier_min': tier_min,
-                'entry': entry
-            })
+    for sf in save_files:
+        key = str(Path(sf['path']).resolve())
+        entry = cache.get(key)
+        # Entries from before names were read have no ship_name and are redone.
+        if not (entry and entry.get('size') == sf['size'] and entry.get('mtime') == sf['mtime']
+                and ('ship_name' in entry['meta'] or 'error' in entry['meta'])):
+            try:
+                meta = summarize_save_header(read_save_header(sf['path']))
+            except (OSError, EOFError, zlib.error, UnicodeDecodeError) as e:
+                meta = {'error': str(e)}
+            entry = {'size': sf['size'], 'mtime': sf['mtime'], 'meta': meta}
+        fresh[key] = entry
+        sf['meta'] = entry['meta']
     
-    return player_factions
+    # Only the listed, unchanged saves survive: deleted files and files that
+    # were rewritten since drop out of the cache here.
+    if fresh != cache:
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(fresh, f)
+        except OSError:
+            pass
+    return save_files
 
 
-def edit_faction_reputation(faction_entry):
-    current_rep = faction_entry.get('reputation', 0)
-    faction_name = faction_entry.get('f1', 'Unknown')
+def _short_guid(guid):
+    return guid[:8] if guid else '-'
+
+
+def format_save_metadata(meta):
+    if 'error' in meta:
+        return f"unreadable ({meta['error']})"
+    credits = meta.get('credits')
+    credits_str = f"{credits:,}" if isinstance(credits, int) else str(credits)
+    tiers = ', '.join(f"{meta['tiers'][tier]} {tier}" for tier, _ in REPUTATION_TIERS
+                      if tier in meta.get('tiers', {}))
+    ship = meta.get('ship_name') or _short_guid(meta.get('ship'))
+    poi = meta.get('poi_name') or _short_guid(meta.get('poi'))
+    return f"credits {credits_str} | ship {ship} | POI {poi} | {tiers or 'no factions'}"
+
+
+def select_save_file():
+    save_files = list_save_files()
+    
+    if not save_files:
+        print("No .save files found in current directory.")
+        sys.exit(1)
+    
+    if len(save_files) == 1:
+        print(f"Found 1 save file: {save_files[0]['name']}")
+        return str(save_files[0]['path'])
+    
+    get_save_metadata(save_files)
+    print("\nAvailable save files (newest first):")
+    for idx, sf in enumerate(save_files):
+        print(f"  {idx+1}. {sf['name']}")
+        print(f"       {format_save_metadata(sf['meta'])}")
     
     while True:
-        new_value = input(f"Enter new reputation for {faction_name} (current: {current_rep}, range: -25000 to 15000): ").strip()
-        if not new_value:
-            return
+        choice = input(f"\nSelect save file [1-{len(save_files)}] (default: 1): ").strip()
+        if not choice:
+            return str(save_files[0]['path'])
         
         try:
-            new_rep = int(new_value)
-            if -25000 <= new_rep <= 15000:
-                faction_entry['reputation'] = new_rep
-                tier_name, _ = get_reputation_tier(new_rep)
-                print(f"Updated {faction_name} to {new_rep:,} - {tier_name}")
-                return
+            idx = int(choice) - 1
+            if 0 <= idx < len(save_files):
+                return str(save_files[idx]['path'])
             else:
-                print("Value must be between -25000 and 15000.")
+                print("Invalid selection.")
         except ValueError:
-            print("Invalid input. Please enter a number.")
+            print("Invalid input.")
 
 
-def edit_factions_menu(data, factions):
-    while True:
-        print("\nPlayer Faction Reputations:")
-        for idx, faction in enumerate(factions):
-            print(f"  {idx+1}. {faction['faction']}: {faction['reputation']:,} - {faction['tier']}")
-        
-        print(f"\n[1-{len(factions)}] Select faction to edit | [z/Z] Back")
-        choice = input("Choice: ").strip().lower()
-        
-        if choice == 'z':
-            break
-        
+def _json_default(obj):
+    if isinstance(obj, LazyList):
+        return obj.materialize()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _encode_json(obj):
+    return _json_codec['dumps'](obj)
+
+
+_LAZY_PREFIXES = {path[:i] for path in LAZY_PATHS for i in range(len(path))}
+
+
+def _iter_parts(node, path):
+    # Yields encoded strings, or (text, start, end, reencode) spans for lazy
+    # elements that can still be produced from the original text.
+    if isinstance(node, LazyList):
+        reuse = node.is_canonical()
+        yield '['
+        for idx in range(len(node)):
+            if idx:
+                yield ','
+            if node.is_dirty(idx) or (not reuse and node.is_loaded(idx)):
+                yield _encode_json(node[idx])
+            else:
+                yield node.span(idx) + (not reuse,)
+        yield ']'
+    elif path in _LAZY_PREFIXES and isinstance(node, dict):
+        yield '{'
+        for idx, (key, value) in enumerate(node.items()):
+            if idx:
+                yield ','
+            yield _encode_json(key)
+            yield ':'
+            yield from _iter_parts(value, path + (key,))
+        yield '}'
+    else:
+        yield _encode_json(node)
+
+
+def _resolve_part(part):
+    if isinstance(part, str):
+        return part
+    text, start, end, reencode = part
+    if reencode:
+        return _encode_json(decode_json_span(text, start, end))
+    return text[start:end]
+
+
+def iter_encoded_savegame(data):
+    # Untouched lazy elements are written back from the original text; only
+    # dirty elements and the small header around them are re-encoded. The
+    # result is identical to _encode_json(data).
+    return map(_resolve_part, _iter_parts(data, ()))
+
+
+class SaveSnapshot:
+    # The save as of one moment, for validating and writing on another
+    # thread while editing goes on. Taking it only copies the dicts above
+    # the lazy lists and each list's element references; everything else is
+    # shared with the live save. Before an edit changes a shared element or
+    # header value, preserve() deep-copies it into the snapshot (copy on
+    # write), so only what is edited while the save runs is ever copied.
+    # The writer encodes under the lock preserve() takes, and never sees an
+    # edit half done.
+    def __init__(self, data):
+        self.lock = threading.Lock()
+        self.released = False
+        self.size = 0
+        self.written = 0
+        self.data = self._freeze(data, ())
+        state = getattr(data, 'state', None)
+        if state is not None:
+            state.setdefault('snapshots', []).append(self)
+    
+    def _freeze(self, node, path):
+        if path in LAZY_PATHS and isinstance(node, LazyList):
+            # Progress is measured against the original text until the
+            # real size is known.
+            self.size = max(self.size, node.source_size())
+            return node.copy()
+        if path in LAZY_PATHS and isinstance(node, list):
+            return list(node)
+        if path in _LAZY_PREFIXES and isinstance(node, dict):
+            return {key: self._freeze(value, path + (key,)) for key, value in node.items()}
+        return node
+    
+    def preserve(self, data, path):
+        # Called before the live save is changed at path. The spine and the
+        # lists are the snapshot's own; the first element or header value
+        # the edit reaches into is copied if the snapshot still shares it.
+        live, frozen = data, self.data
+        for depth, key in enumerate(path[:-1]):
+            try:
+                child = live[key]
+            except (KeyError, IndexError, TypeError):
+                return
+            prefix = path[:depth + 1]
+            if prefix in _LAZY_PREFIXES or prefix in LAZY_PATHS:
+                if not isinstance(frozen, dict) or key not in frozen:
+                    return
+                live, frozen = child, frozen[key]
+                continue
+            if not isinstance(child, (dict, list)):
+                return
+            # Indices may have shifted since the snapshot, so the shared
+            # element is found by identity.
+            if isinstance(frozen, LazyList):
+                target = frozen.loaded_index(child)
+            elif isinstance(frozen, list):
+                target = next((idx for idx, item in enumerate(frozen) if item is child), None)
+            else:
+                target = key if isinstance(frozen, dict) and frozen.get(key) is child else None
+            if target is not None:
+                with self.lock:
+                    frozen[target] = copy.deepcopy(child)
+            return
+    
+    def validate(self, workers=1):
+        with self.lock:
+            return validate_savegame(self.data, workers=workers)
+    
+    def chunks(self):
+        parts = _iter_parts(self.data, ())
+        while True:
+            with self.lock:
+                part = next(parts, None)
+                chunk = None if part is None else _resolve_part(part)
+            if chunk is None:
+                break
+            yield chunk
+            self.written += len(chunk)
+        self.size = self.written
+    
+    def release(self):
+        self.released = True
+
+
+SAVE_COMPRESSLEVEL = 6
+SAVE_BLOCK_SIZE = 1 << 20
+_DEFLATE_WINDOW = 32768
+
+
+def _iter_blocks(chunks, block_size):
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= block_size:
+            yield ''.join(pending).encode('utf-8')
+            pending = []
+            pending_size = 0
+    if pending:
+        yield ''.join(pending).encode('utf-8')
+
+
+def _compress_block(block, dictionary, level, last):
+    # Raw deflate primed with the previous block's tail, the same trick pigz
+    # uses: back-references may reach into the previous block, so the joined
+    # output is one ordinary deflate stream and compresses nearly as well as
+    # a single-threaded run.
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _write_gzip_parallel(f, chunks, level, threads, block_size):
+    xfl = 2 if level == 9 else 4 if level == 1 else 0
+    f.write(b'\x1f\x8b\x08\x00' + struct.pack('<I', int(time.time())) + bytes((xfl, 255)))
+    
+    crc = 0
+    size = 0
+    pending = []
+    previous_tail = b''
+    blocks = _iter_blocks(chunks, block_size)
+    block = next(blocks, b'')
+    
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        while True:
+            next_block = next(blocks, None)
+            last = next_block is None
+            crc = zlib.crc32(block, crc)
+            size += len(block)
+            pending.append(pool.submit(_compress_block, block, previous_tail, level, last))
+            previous_tail = block[-_DEFLATE_WINDOW:]
+            
+            # Keep a bounded number of blocks in flight so memory stays flat.
+            while len(pending) > threads * 2 or (last and pending):
+                f.write(pending.pop(0).result())
+            if last:
+                break
+            block = next_block
+    
+    f.write(struct.pack('<II', crc, size & 0xffffffff))
+
+
+# Snapshots of saves about to be overwritten. objects/<sha256> holds each
+# distinct file once, index/<save name>.json lists its snapshots oldest
+# first, and only the newest BACKUP_KEEP per save are kept.
+BACKUP_DIR_NAME = '.savegame_backups'
+BACKUP_KEEP = 10
+
+
+def _backup_dir(filename):
+    return os.path.join(os.path.dirname(os.path.abspath(filename)), BACKUP_DIR_NAME)
+
+
+def _backup_index_path(backup_dir, filename):
+    return os.path.join(backup_dir, 'index', os.path.basename(filename) + '.json')
+
+
+def list_backups(filename, backup_dir=None):
+    backup_dir = backup_dir or _backup_dir(filename)
+    try:
+        with open(_backup_index_path(backup_dir, filename)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _replace_file(filename, write):
+    temp_name = f"{filename}.{os.getpid()}.tmp"
+    try:
+        write(temp_name)
+        os.replace(temp_name, filename)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+def backup_save(filename, keep=BACKUP_KEEP, backup_dir=None):
+    backup_dir = backup_dir or _backup_dir(filename)
+    objects = os.path.join(backup_dir, 'objects')
+    os.makedirs(objects, exist_ok=True)
+    os.makedirs(os.path.join(backup_dir, 'index'), exist_ok=True)
+    
+    digest = _file_digest(filename)
+    object_path = os.path.join(objects, digest)
+    if not os.path.exists(object_path):
+        _replace_file(object_path, lambda temp_name: shutil.copyfile(filename, temp_name))
+    
+    entries = list_backups(filename, backup_dir)
+    if not entries or entries[-1]['sha256'] != digest:
+        entries.append({'sha256': digest, 'time': time.time(), 'size': os.path.getsize(filename)})
+    pruned, entries = entries[:-keep], entries[-keep:]
+    
+    def write_index(temp_name):
+        with open(temp_name, 'w') as f:
+            json.dump(entries, f, indent=1)
+    _replace_file(_backup_index_path(backup_dir, filename), write_index)
+    
+    # Only objects this prune released are candidates, and only if no other
+    # save's index still points at them.
+    candidates = {entry['sha256'] for entry in pruned} - {entry['sha256'] for entry in entries}
+    if candidates:
+        index_dir = os.path.join(backup_dir, 'index')
+        for name in os.listdir(index_dir):
+            if name.endswith('.json'):
+                candidates -= {entry['sha256'] for entry in list_backups(name[:-5], backup_dir)}
+        for sha in candidates:
+            try:
+                os.remove(os.path.join(objects, sha))
+            except OSError:
+                pass
+    return digest
+
+
+def restore_backup(filename, sha256, backup_dir=None, keep=BACKUP_KEEP):
+    # The current save is backed up first, so a restore can be undone too.
+    backup_dir = backup_dir or _backup_dir(filename)
+    source = os.path.join(backup_dir, 'objects', sha256)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"no backup object {sha256} in {backup_dir}")
+    if os.path.exists(filename):
+        backup_save(filename, keep=keep, backup_dir=backup_dir)
+    _replace_file(filename, lambda temp_name: shutil.copyfile(source, temp_name))
+
+
+def print_backups(filename):
+    # Newest first, numbered the way --restore takes them.
+    backup_dir = _backup_dir(filename)
+    entries = list_backups(filename, backup_dir)
+    if not entries:
+        print(f"No backups of {filename} in {backup_dir}")
+        return
+    print(f"Backups of {filename} (newest first):")
+    for number, entry in enumerate(reversed(entries), 1):
+        object_path = os.path.join(backup_dir, 'objects', entry['sha256'])
         try:
-            faction_idx = int(choice) - 1
-            if 0 <= faction_idx < len(factions):
-                edit_faction_reputation(factions[faction_idx]['entry'])
-                factions = get_player_factions(data)
+            meta = summarize_save_header(read_save_header(object_path))
+        except (OSError, EOFError, zlib.error, UnicodeDecodeError) as e:
+            meta = {'error': str(e)}
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['time']))
+        print(f"  {number}. {stamp}  {entry['size'] / 1024:,.0f} KB  {entry['sha256'][:12]}")
+        print(f"       {format_save_metadata(meta)}")
+
+
+def _fsync_directory(directory):
+    # Makes the rename itself durable; not every platform can open a directory.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def save_savegame(filename, data, compresslevel=SAVE_COMPRESSLEVEL, threads=1,
+                  block_size=SAVE_BLOCK_SIZE, backup_keep=0):
+    # Written to a temp file next to the target, fsynced and renamed over
+    # it, so a crash leaves either the old save or the new one, never half.
+    directory = os.path.dirname(os.path.abspath(filename))
+    temp_name = os.path.join(directory, f".{os.path.basename(filename)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    chunks = data.chunks() if isinstance(data, SaveSnapshot) else iter_encoded_savegame(data)
+    try:
+        with open(temp_name, 'wb') as f:
+            if threads <= 1:
+                with gzip.GzipFile(os.path.basename(filename), 'wb', compresslevel, f) as gz:
+                    for chunk in chunks:
+                        gz.write(chunk.encode('utf-8'))
             else:
-                print("Invalid selection.")
-        except ValueError:
-            print("Invalid input.")
+                _write_gzip_parallel(f, chunks, compresslevel, threads, block_size)
+            f.flush()
+            os.fsync(f.fileno())
+        if backup_keep and os.path.exists(filename):
+            backup_save(filename, keep=backup_keep)
+        os.replace(temp_name, filename)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+    _fsync_directory(directory)
 
 
-def list_save_files(directory='.'):
-    save_files = []
-    for file in Path(directory).glob('*.save'):
-        if file.is_file():
-            mtime = file.stat().st_mtime
-            save_files.append({'path': file, 'name': file.name, 'mtime': mtime})
-    save_files.sort(key=lambda x: x['mtime'], reverse=True)
-    return save_files
+class BackgroundSave:
+    # Validation and save_savegame on a worker thread from a snapshot, so
+    # editing can go on while the save is checked, encoded and compressed.
+    # zlib releases the GIL, so the prompt stays responsive. If validation
+    # finds problems nothing is written and they are left in problems.
+    def __init__(self, filename, data, on_done=None, validate_workers=0, **save_options):
+        self.filename = filename
+        self.snapshot = SaveSnapshot(data)
+        self.stage = 'validating' if validate_workers else 'writing'
+        self.problems = []
+        self.error = None
+        self.seconds = None
+        self._on_done = on_done
+        self._thread = threading.Thread(target=self._run, args=(validate_workers, save_options),
+                                        name=f"save {filename}")
+        self._thread.start()
+    
+    def _run(self, validate_workers, save_options):
+        start = time.perf_counter()
+        try:
+            if validate_workers:
+                self.problems = self.snapshot.validate(validate_workers)
+                self.stage = 'writing'
+            if not self.problems:
+                save_savegame(self.filename, self.snapshot, **save_options)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.snapshot.release()
+        self.seconds = time.perf_counter() - start
+        if self._on_done is not None:
+            self._on_done(self.filename)
+    
+    @property
+    def progress(self):
+        return min(1.0, self.snapshot.written / self.snapshot.size) if self.snapshot.size else 1.0
+    
+    def done(self):
+        return not self._thread.is_alive()
+    
+    def wait(self, on_progress=None, interval=0.25):
+        while self._thread.is_alive():
+            self._thread.join(interval)
+            if on_progress is not None:
+                on_progress(self)
+
+
+# Structural checks run before writing. Sectors and ships are independent,
+# so they are checked in chunks on a process pool; only GUIDs and problem
+# strings come back, and cross-references are checked here afterwards.
+MAX_ITEM_COUNT = 2**31 - 1
+MAX_ASPECT_SLOTS = 2
+VALIDATION_CHUNK = 64
+# Fewer unparsed elements than this are checked in process: starting the
+# pool would cost more than parsing them.
+VALIDATION_POOL_MIN = 2 * VALIDATION_CHUNK
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value))
+
+
+def _problem(problems, path, message):
+    problems.append(f"{path_to_pointer(path) or '/'}: {message}")
+
+
+def _check_type(problems, path, value, expected, name):
+    if not isinstance(value, expected):
+        _problem(problems, path, f"expected {name}, found {type(value).__name__}")
+        return False
+    return True
+
+
+def _check_count(problems, path, entry, minimum):
+    count = entry.get('count')
+    if not _is_int(count) or not minimum <= count <= MAX_ITEM_COUNT:
+        _problem(problems, path + ('count',), f"count {count!r} is not an integer in {minimum}..{MAX_ITEM_COUNT}")
+
+
+def _check_guid(problems, guids, path, node):
+    guid = node.get('guid')
+    if guid is None:
+        return
+    if isinstance(guid, str) and guid:
+        guids.append((guid, path))
+    else:
+        _problem(problems, path + ('guid',), f"guid {guid!r} is not a non-empty string")
+
+
+def _check_item(problems, path, item):
+    if not _check_type(problems, path, item, dict, "an item object"):
+        return
+    if 'displayName' in item and not isinstance(item['displayName'], str):
+        _problem(problems, path + ('displayName',), "displayName is not a string")
+    
+    stats = item.get('stats', [])
+    if _check_type(problems, path + ('stats',), stats, list, "a list"):
+        for idx, stat in enumerate(stats):
+            stat_path = path + ('stats', idx)
+            if not _check_type(problems, stat_path, stat, dict, "a stat object"):
+                continue
+            value_key = get_stat_value_key(stat)
+            if value_key in stat and not _is_number(stat[value_key]):
+                _problem(problems, stat_path + (value_key,), f"{stat[value_key]!r} is not a finite number")
+    
+    slots = item.get('aspectSlots', [])
+    if not _check_type(problems, path + ('aspectSlots',), slots, list, "a list"):
+        return
+    if len(slots) > MAX_ASPECT_SLOTS:
+        _problem(problems, path + ('aspectSlots',), f"{len(slots)} aspect slots, at most {MAX_ASPECT_SLOTS} allowed")
+    indexes = set()
+    for idx, slot in enumerate(slots):
+        slot_path = path + ('aspectSlots', idx)
+        if not _check_type(problems, slot_path, slot, dict, "an aspect slot object"):
+            continue
+        if not isinstance(slot.get('equipAspect'), (str, type(None))):
+            _problem(problems, slot_path + ('equipAspect',), "equipAspect is not a string")
+        if not isinstance(slot.get('index'), str):
+            _problem(problems, slot_path + ('index',), f"index {slot.get('index')!r} is not a string")
+        elif slot['index'] in indexes:
+            _problem(problems, slot_path + ('index',), f"duplicate aspect slot index {slot['index']!r}")
+        indexes.add(slot.get('index'))
+
+
+def _check_sector(problems, guids, path, sector):
+    if not _check_type(problems, path, sector, dict, "a sector object"):
+        return
+    _check_guid(problems, guids, path, sector)
+    systems = sector.get('systems', [])
+    if not _check_type(problems, path + ('systems',), systems, list, "a list"):
+        return
+    for system_idx, system in enumerate(systems):
+        system_path = path + ('systems', system_idx)
+        if not _check_type(problems, system_path, system, dict, "a system object"):
+            continue
+        _check_guid(problems, guids, system_path, system)
+        pois = system.get('pointsOfInterest', [])
+        if not _check_type(problems, system_path + ('pointsOfInterest',), pois, list, "a list"):
+            continue
+        for poi_idx, poi in enumerate(pois):
+            poi_path = system_path + ('pointsOfInterest', poi_idx)
+            if not _check_type(problems, poi_path, poi, dict, "a point of interest object"):
+                continue
+            _check_guid(problems, guids, poi_path, poi)
+            if 'materialStorage' not in poi:
+                continue
+            storage_path = poi_path + ('materialStorage',)
+            if not _check_type(problems, storage_path, poi['materialStorage'], dict, "an object"):
+                continue
+            items = poi['materialStorage'].get('items', [])
+            if not _check_type(problems, storage_path + ('items',), items, list, "a list"):
+                continue
+            for idx, entry in enumerate(items):
+                entry_path = storage_path + ('items', idx)
+                if _check_type(problems, entry_path, entry, dict, "a material entry"):
+                    if not isinstance(entry.get('item'), str):
+                        _problem(problems, entry_path + ('item',), "material id is not a string")
+                    _check_count(problems, entry_path, entry, 0)
+
+
+def _check_ship(problems, guids, path, ship):
+    if not _check_type(problems, path, ship, dict, "a ship object"):
+        return
+    _check_guid(problems, guids, path, ship)
+    equipment = ship.get('equipment', {})
+    if _check_type(problems, path + ('equipment',), equipment, dict, "an object"):
+        for slot, item in equipment.items():
+            if item:
+                _check_item(problems, path + ('equipment', slot), item)
+    hardpoints = ship.get('hardpoints', [])
+    if _check_type(problems, path + ('hardpoints',), hardpoints, list, "a list"):
+        for idx, item in enumerate(hardpoints):
+            if item:
+                _check_item(problems, path + ('hardpoints', idx), item)
+    cargo = ship.get('cargo', {})
+    if not _check_type(problems, path + ('cargo',), cargo, dict, "an object"):
+        return
+    items = cargo.get('items', [])
+    if not _check_type(problems, path + ('cargo', 'items'), items, list, "a list"):
+        return
+    for idx, entry in enumerate(items):
+        entry_path = path + ('cargo', 'items', idx)
+        if not _check_type(problems, entry_path, entry, dict, "a cargo entry"):
+            continue
+        if isinstance(entry.get('item'), dict):
+            _check_item(problems, entry_path + ('item',), entry['item'])
+        elif not isinstance(entry.get('item'), str):
+            _problem(problems, entry_path + ('item',), "cargo item is neither an id nor an item object")
+        _check_count(problems, entry_path, entry, 1)
+
+
+_SUBTREE_CHECKS = {
+    ('Player', 'map', 'sectors'): _check_sector,
+    ('Player', 'spaceShips'): _check_ship,
+}
+
+
+def _validate_chunk(list_path, start, elements):
+    # In a worker, elements arrive as JSON text and are parsed here.
+    problems = []
+    guids = []
+    check = _SUBTREE_CHECKS[list_path]
+    for offset, element in enumerate(elements):
+        if isinstance(element, str):
+            element = decode_json(element)
+        check(problems, guids, list_path + (start + offset,), element)
+    return problems, guids
+
+
+def _check_player(problems, player):
+    credits = player.get('credits', '0')
+    if not ((isinstance(credits, str) and credits.isdigit()) or (_is_int(credits) and credits >= 0)):
+        _problem(problems, ('Player', 'credits'), f"credits {credits!r} is not a non-negative number")
+    
+    faction_data = player.get('factionData', [])
+    if _check_type(problems, ('Player', 'factionData'), faction_data, list, "a list"):
+        pairs = set()
+        for idx, entry in enumerate(faction_data):
+            path = ('Player', 'factionData', idx)
+            if not _check_type(problems, path, entry, dict, "a faction relation object"):
+                continue
+            if not (isinstance(entry.get('f1'), str) and isinstance(entry.get('f2'), str)):
+                _problem(problems, path, "f1 and f2 must be faction ids")
+            reputation = entry.get('reputation', 0)
+            if not _is_number(reputation) or not REPUTATION_MIN <= reputation <= REPUTATION_MAX:
+                _problem(problems, path + ('reputation',),
+                         f"reputation {reputation!r} is outside {REPUTATION_MIN}..{REPUTATION_MAX}")
+            pair = frozenset((entry.get('f1'), entry.get('f2')))
+            if pair in pairs:
+                _problem(problems, path, f"duplicate relation {entry.get('f1')}/{entry.get('f2')}")
+            pairs.add(pair)
+    
+    # The global inventory is a list of items or an object with an items
+    # list of {'item', 'count'} entries; anything else would not load.
+    inventory = player.get('globalInventory', [])
+    if isinstance(inventory, dict):
+        items = inventory.get('items', [])
+        if _check_type(problems, ('Player', 'globalInventory', 'items'), items, list, "a list"):
+            for idx, entry in enumerate(items):
+                path = ('Player', 'globalInventory', 'items', idx)
+                if _check_type(problems, path, entry, dict, "an inventory entry"):
+                    if isinstance(entry.get('item'), dict):
+                        _check_item(problems, path + ('item',), entry['item'])
+                    _check_count(problems, path, entry, 1)
+    elif isinstance(inventory, list):
+        for idx, item in enumerate(inventory):
+            if item:
+                _check_item(problems, ('Player', 'globalInventory', idx), item)
+    else:
+        _problem(problems, ('Player', 'globalInventory'), "expected a list or an object with items")
+
+
+def validate_savegame(data, workers=1):
+    problems = []
+    if not _check_type(problems, (), data, dict, "an object") or \
+            not _check_type(problems, ('Player',), data.get('Player'), dict, "an object"):
+        return problems
+    player = data['Player']
+    _check_player(problems, player)
+    
+    guids = []
+    # Each chunk is split into runs of loaded and unparsed elements. Loaded
+    # ones are checked in process as they are; only the original text of
+    # unparsed ones is sent to the workers, so nothing is re-encoded.
+    jobs = []
+    for list_path in LAZY_PATHS:
+        try:
+            elements = resolve_path(data, list_path)
+        except (KeyError, IndexError, TypeError):
+            continue
+        if not _check_type(problems, list_path, elements, (list, LazyList), "a list"):
+            continue
+        lazy = isinstance(elements, LazyList)
+        for start in range(0, len(elements), VALIDATION_CHUNK):
+            indices = range(start, min(start + VALIDATION_CHUNK, len(elements)))
+            for unparsed, run in itertools.groupby(indices, lambda idx: lazy and not elements.is_loaded(idx)):
+                jobs.append((list_path, elements, list(run), unparsed))
+    
+    unparsed_count = sum(len(run) for _, _, run, unparsed in jobs if unparsed)
+    if workers <= 1 or unparsed_count < VALIDATION_POOL_MIN:
+        # Unparsed elements are peeked, not kept.
+        results = [_validate_chunk(list_path, run[0], [_peek(elements, idx) for idx in run])
+                   for list_path, elements, run, _ in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pooled = pool.map(_validate_chunk, *zip(*[
+                (list_path, run[0], [elements.raw(idx) for idx in run])
+                for list_path, elements, run, unparsed in jobs if unparsed]))
+            results = [next(pooled) if unparsed else
+                       _validate_chunk(list_path, run[0], [elements[idx] for idx in run])
+                       for list_path, elements, run, unparsed in jobs]
+    for chunk_problems, chunk_guids in results:
+        problems.extend(chunk_problems)
+        guids.extend(chunk_guids)
+    
+    seen = {}
+    for guid, path in guids:
+        if guid in seen:
+            _problem(problems, path + ('guid',), f"guid {guid} is also used at {path_to_pointer(seen[guid])}")
+        else:
+            seen[guid] = path
+    ship_guid = player.get('currentSpaceShip')
+    if ship_guid and (ship_guid not in seen or seen[ship_guid][:2] != ('Player', 'spaceShips')):
+        _problem(problems, ('Player', 'currentSpaceShip'), f"no ship with guid {ship_guid}")
+    poi_guid = player.get('currentPointOfInterest')
+    if poi_guid and (poi_guid not in seen or 'pointsOfInterest' not in seen[poi_guid]):
+        _problem(problems, ('Player', 'currentPointOfInterest'), f"no point of interest with guid {poi_guid}")
+    return problems
+
+
+_TOKEN_SPLIT = re.compile(r'[^0-9a-z]+')
+
+
+def name_tokens(name):
+    return [token for token in _TOKEN_SPLIT.split(name.lower()) if token]
+
+
+class ItemCatalog:
+    # One pass over every ship's equipment, hardpoints and cargo plus the
+    # global inventory. Rows are indexed by displayName token, itemType and
+    # aspect, so menus only touch the rows they show. Edits to stats and
+    # counts are read live through the rows; only aspect or item changes
+    # need invalidate_item_catalog().
+    def __init__(self, data):
+        self.rows = []
+        self.by_token = {}
+        self.by_type = {}
+        self.by_aspect = {}
+        self.by_ship = {}
+        self.cargo_by_ship = {}
+        # by_ship holds the fitted equipment and hardpoints the ship menu
+        # shows; all_by_ship adds the ship's cargo items for ship: queries.
+        self.all_by_ship = {}
+        self._views = {}
+        
+        player = data.get('Player', {})
+        for ship_idx, ship in enumerate(player.get('spaceShips', [])):
+            location = f'Ship {ship_idx} ({ship.get("type", "Unknown")})'
+            ship_path = ('Player', 'spaceShips', ship_idx)
+            ship_rows = self.by_ship.setdefault(ship_idx, [])
+            
+            for slot, item in ship.get('equipment', {}).items():
+                if item and isinstance(item, dict):
+                    row = ItemRow(location, f'Equipment: {slot}', item,
+                                  ship_path + ('equipment', slot), 'equipment', ship_idx)
+                    ship_rows.append(row)
+                    self._add(row)
+            
+            for hp_idx, item in enumerate(ship.get('hardpoints', [])):
+                if item and isinstance(item, dict):
+                    row = ItemRow(location, f'Hardpoint {hp_idx}', item,
+                                  ship_path + ('hardpoints', hp_idx), 'hardpoint', ship_idx)
+                    ship_rows.append(row)
+                    self._add(row)
+            
+            cargo_rows = self.cargo_by_ship.setdefault(ship_idx, [])
+            for cargo_idx, entry in enumerate(ship.get('cargo', {}).get('items', [])):
+                if entry and isinstance(entry, dict) and isinstance(entry.get('item'), (dict, str)):
+                    cargo_path = ship_path + ('cargo', 'items', cargo_idx)
+                    cargo_rows.append(CargoRow(cargo_idx, entry, cargo_path))
+                    if isinstance(entry['item'], dict):
+                        self._add(ItemRow(location, f'Cargo {cargo_idx}', entry['item'],
+                                          cargo_path + ('item',), 'cargo', ship_idx))
+        
+        # The global inventory comes as a plain list of items or as a dict
+        # of {'item', 'count'} entries, depending on the save.
+        global_inv = player.get('globalInventory', [])
+        if isinstance(global_inv, dict):
+            for idx, entry in enumerate(global_inv.get('items', [])):
+                if isinstance(entry, dict) and isinstance(entry.get('item'), dict):
+                    self._add(ItemRow('Global Inventory', f'Index {idx}', entry['item'],
+                                      ('Player', 'globalInventory', 'items', idx, 'item'), 'inventory'))
+        else:
+            for idx, item in enumerate(global_inv):
+                if item and isinstance(item, dict):
+                    self._add(ItemRow('Global Inventory', f'Index {idx}', item,
+                                      ('Player', 'globalInventory', idx), 'inventory'))
+    
+    def _add(self, row):
+        self.rows.append(row)
+        for token in set(name_tokens(row.name)):
+            self.by_token.setdefault(token, []).append(row)
+        self.by_type.setdefault(row.item.get('itemType', ''), []).append(row)
+        for aspect in set(get_item_aspects(row.item)):
+            self.by_aspect.setdefault(aspect, []).append(row)
+        if row.ship_idx is not None:
+            self.all_by_ship.setdefault(row.ship_idx, []).append(row)
+    
+    def rows_containing(self, lowered):
+        # Rows whose lowercased name contains the text. Without separators
+        # a match lies inside one token, so the rows of every token that
+        # contains the text are exactly those rows; otherwise None (scan).
+        if not lowered or _TOKEN_SPLIT.search(lowered):
+            return None
+        tokens = [token for token in self.by_token if lowered in token]
+        if len(tokens) == 1:
+            return self.by_token[tokens[0]]
+        matched = {id(row) for token in tokens for row in self.by_token[token]}
+        return [row for row in self.rows if id(row) in matched]
+    
+    def view(self, key, build):
+        # Derived row lists live as long as the catalog does.
+        if key not in self._views:
+            self._views[key] = build(self)
+        return self._views[key]
+
+
+def get_item_catalog(data):
+    state = _get_state(data)
+    if 'item_catalog' not in state:
+        state['item_catalog'] = ItemCatalog(data)
+    return state['item_catalog']
+
+
+def invalidate_item_catalog(data):
+    _get_state(data).pop('item_catalog', None)
+    _get_state(data).pop('search_index', None)
+
+
+class SearchHit:
+    __slots__ = ('kind', 'row', 'where')
 
+    def __init__(self, kind, row, where):
+        self.kind = kind
+        self.row = row
+        self.where = where
 
-def select_save_file():
-    save_files = list_save_files()
-    
-    if not save_files:
-        print("No .save files found in current directory.")
-        sys.exit(1)
+    @property
+    def name(self):
+        if self.kind == 'item':
+            return self.row.name
+        if self.kind == 'cargo':
+            return f"{ORE_CRYSTAL_NAMES.get(self.row.item, self.row.item)} (x{self.row.count:,})"
+        return f"{self.row.name} (x{self.row.count:,})"
+
+
+class SearchIndex:
+    # Inverted index over every item in the save: ship equipment, hardpoints,
+    # cargo, the global inventory and station storage. Terms are displayName
+    # tokens, item ids, item types and aspect names; the sorted term list
+    # turns each query word into a bisect prefix range. Station storage rows
+    # follow the other hits as doc ids storage_base + column row, tokenized
+    # once per material and turned into hits only when shown.
+    def __init__(self, data):
+        self.hits = []
+        self.postings = {}
+        
+        catalog = get_item_catalog(data)
+        for row in catalog.rows:
+            item = row.item
+            terms = name_tokens(row.name) + name_tokens(item.get('itemType', ''))
+            terms += name_tokens(item.get('aspectName', ''))
+            for aspect in get_item_aspects(item):
+                terms += name_tokens(aspect)
+            self._add(SearchHit('item', row, f"{row.location}, {row.slot}"), terms)
+        
+        for ship_idx, cargo_rows in catalog.cargo_by_ship.items():
+            for row in cargo_rows:
+                if row.is_simple:
+                    item_id = str(row.item)
+                    self._add(SearchHit('cargo', row, f"Ship {ship_idx} cargo {row.cargo_idx}"),
+                              [item_id.lower()] + name_tokens(ORE_CRYSTAL_NAMES.get(item_id, '')))
+        
+        self.columns = columns = get_material_columns(data)
+        self.storage_base = base = len(self.hits)
+        unsorted = set()
+        for code, item_id in enumerate(columns.item_ids):
+            docs = [base + row for row in columns.rows_by_item[code]]
+            for term in set([item_id.lower()] + name_tokens(columns.names[code])):
+                if term:
+                    postings = self.postings.setdefault(term, [])
+                    if postings and postings[-1] > docs[0]:
+                        unsorted.add(term)
+                    postings.extend(docs)
+        for term in unsorted:
+            self.postings[term].sort()
+        
+        self.terms = sorted(self.postings)
     
-    if len(save_files) == 1:
-        print(f"Found 1 save file: {save_files[0]['name']}")
-        return str(save_files[0]['path'])
+    def _add(self, hit, terms):
+        doc = len(self.hits)
+        self.hits.append(hit)
+        for term in set(terms):
+            if term:
+                self.postings.setdefault(term, []).append(doc)
     
-    print("\nAvailable save files (newest first):")
-    for idx, sf in enumerate(save_files):
-        print(f"  {idx+1}. {sf['name']}")
+    def hit(self, doc):
+        if doc < self.storage_base:
+            return self.hits[doc]
+        row = doc - self.storage_base
+        station = self.columns.stations[row]
+        return SearchHit('storage', self.columns.material_row(row),
+                         f"{station['name']} ({station['system']}, {station['zone']})")
     
-    while True:
-        choice = input(f"\nSelect save file [1-{len(save_files)}] (default: 1): ").strip()
-        if not choice:
-            return str(save_files[0]['path'])
+    def search(self, query):
+        # Every query word must prefix-match some term of the hit. Posting
+        # lists are sorted, so a few candidates from the rarest word are
+        # checked against the other words by bisection instead of a set.
+        groups = []
+        for word in name_tokens(query):
+            lo = bisect.bisect_left(self.terms, word)
+            hi = bisect.bisect_left(self.terms, word + '\uffff', lo)
+            if lo == hi:
+                return []
+            groups.append([self.postings[term] for term in self.terms[lo:hi]])
+        if not groups:
+            return []
         
-        try:
-            idx = int(choice) - 1
-            if 0 <= idx < len(save_files):
-                return str(save_files[idx]['path'])
+        groups.sort(key=lambda lists: sum(map(len, lists)))
+        rarest = groups[0]
+        docs = rarest[0] if len(rarest) == 1 else sorted(set().union(*rarest))
+        for lists in groups[1:]:
+            if len(docs) * len(lists) * 16 < sum(map(len, lists)):
+                docs = [doc for doc in docs if any(_sorted_contains(postings, doc) for postings in lists)]
             else:
-                print("Invalid selection.")
-        except ValueError:
-            print("Invalid input.")
+                members = set().union(*lists)
+                docs = [doc for doc in docs if doc in members]
+            if not docs:
+                return []
+        return SearchResults(self, docs)
+
+
+class SearchResults:
+    # Hits are only looked up for the rows actually shown.
+    __slots__ = ('_index', '_docs')
+
+    def __init__(self, index, docs):
+        self._index = index
+        self._docs = docs
 
+    def __len__(self):
+        return len(self._docs)
 
-def save_savegame(filename, data):
-    with gzip.open(filename, 'wt', encoding='utf-8') as f:
-        json.dump(data, f, separators=(',', ':'))
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._index.hit(doc) for doc in self._docs[idx]]
+        return self._index.hit(self._docs[idx])
+
+
+def _sorted_contains(values, value):
+    idx = bisect.bisect_left(values, value)
+    return idx < len(values) and values[idx] == value
+
+
+def get_search_index(data):
+    state = _get_state(data)
+    if 'search_index' not in state:
+        state['search_index'] = SearchIndex(data)
+    return state['search_index']
 
 
 def find_silverheart_items(data):
-    silverheart_items = []
-    ships = data['Player'].get('spaceShips', [])
-    for i, ship in enumerate(ships):
-        eq = ship.get('equipment', {})
-        for slot, item in eq.items():
-            if item and isinstance(item, dict) and 'Silverheart' in item.get('displayName', ''):
-                silverheart_items.append({
-                    'location': f'Ship {i} ({ship.get("type", "Unknown")})',
-                    'slot': f'Equipment: {slot}',
-                    'name': item.get('displayName'),
-                    'ship_idx': i,
-                    'slot_name': slot,
-                    'item': item
-                })
-        
-        hardpoints = ship.get('hardpoints', [])
-        for hp_idx, item in enumerate(hardpoints):
-            if item and isinstance(item, dict) and 'Silverheart' in item.get('displayName', ''):
-                silverheart_items.append({
-                    'location': f'Ship {i} ({ship.get("type", "Unknown")})',
-                    'slot': f'Hardpoint {hp_idx}',
-                    'name': item.get('displayName'),
-                    'ship_idx': i,
-                    'hp_idx': hp_idx,
-                    'item': item
-                })
-    
-    global_inv = data['Player'].get('globalInventory', [])
-    for i, item in enumerate(global_inv):
-        if item and isinstance(item, dict) and 'Silverheart' in item.get('displayName', ''):
-            silverheart_items.append({
-                'location': 'Global Inventory',
-                'slot': f'Index {i}',
-                'name': item.get('displayName'),
-                'inv_idx': i,
-                'item': item
-            })
-    
-    return silverheart_items
-
-
-def edit_item_stats(item):
+    return get_item_catalog(data).view('silverheart', lambda catalog: [
+        row for row in catalog.rows_containing('silverheart') or []
+        if row.kind != 'cargo' and 'Silverheart' in row.name])
+
+
+def get_stat_value_key(stat):
+    if 'multiplier' in stat:
+        return 'multiplier'
+    elif 'amount' in stat:
+        return 'amount'
+    return 'value'
+
+
+def edit_item_stats(data, item, path):
     stats = item.get('stats', [])
     if not stats:
         print("No stats found for this item.")
@@ -392,12 +3128,7 @@ def edit_item_stats(item):
             stat_idx = int(choice) - 1
             if 0 <= stat_idx < len(stats):
                 stat = stats[stat_idx]
-                if 'multiplier' in stat:
-                    value_key = 'multiplier'
-                elif 'amount' in stat:
-                    value_key = 'amount'
-                else:
-                    value_key = 'value'
+                value_key = get_stat_value_key(stat)
                 
                 current_value = stat.get(value_key, 0)
                 stat_name = stat.get('stat', 'Unknown')
@@ -408,7 +3139,7 @@ def edit_item_stats(item):
                     new_value = input(f"Enter new value for {stat_name} (current: {current_value:.2f}): ").strip()
                 
                 if new_value:
-                    stat[value_key] = float(new_value)
+                    apply_edit(data, tuple(path) + ('stats', stat_idx, value_key), float(new_value), 'stat')
                     if value_key == 'multiplier':
                         print(f"Updated {stat_name} to {stat[value_key]:.2f} ({stat[value_key]*100:.1f}%)")
                     else:
@@ -419,51 +3150,161 @@ def edit_item_stats(item):
             print("Invalid input.")
 
 
-def find_active_ship_items(data):
-    current_guid = data.get('Player', {}).get('currentSpaceShip', '')
-    if not current_guid:
-        return None, []
+# Bulk stat queries, e.g. "silverheart type:Weapon in:equipment Damage.multiplier>=1.5"
+# or "aspect:Overcharged *.amount*=2". Filters are field:value terms (bare
+# words match the displayName); transforms are STAT[.KEY]OP NUMBER, where
+# STAT may be * and OP is one of = >= <= *= +=.
+STAT_QUERY_FILTERS = ('name', 'type', 'slot', 'aspect', 'in', 'ship')
+STAT_QUERY_LOCATIONS = ('equipment', 'hardpoint', 'cargo', 'inventory')
+_STAT_TRANSFORM = re.compile(
+    r'^(?P<stat>\*|[^.<>=*+]+)(?:\.(?P<key>multiplier|amount|value))?(?P<op>>=|<=|\*=|\+=|=)(?P<value>-?\d+(?:\.\d*)?|-?\.\d+)$',
+    re.IGNORECASE)
+_STAT_OPERATORS = {
+    '=': lambda old, value: value,
+    '>=': lambda old, value: max(old, value),
+    '<=': lambda old, value: min(old, value),
+    '*=': lambda old, value: old * value,
+    '+=': lambda old, value: old + value,
+}
+
+
+class StatQuery:
+    def __init__(self, text):
+        self.text = text
+        self.filters = []
+        self.transforms = []
+        normalized = text.replace('\u2265', '>=').replace('\u2264', '<=').replace('\u00d7=', '*=').replace('\u00d7', '*=')
+        for term in normalized.split():
+            match = _STAT_TRANSFORM.match(term)
+            if match:
+                stat = match['stat'].lower()
+                key = match['key'].lower() if match['key'] else None
+                # Operators are stored by symbol so queries pickle for batch workers.
+                self.transforms.append((None if stat == '*' else stat, key, match['op'], float(match['value'])))
+                continue
+            field, sep, value = term.partition(':')
+            if not sep:
+                field, value = 'name', term
+            field = field.lower()
+            if field not in STAT_QUERY_FILTERS or not value:
+                raise ValueError(f"Unknown query term: {term}")
+            if field == 'in':
+                value = value.lower().rstrip('s')
+                if value not in STAT_QUERY_LOCATIONS:
+                    raise ValueError(f"in: must be one of {', '.join(STAT_QUERY_LOCATIONS)}")
+            self.filters.append((field, value))
+        if not self.transforms:
+            raise ValueError("Query has no stat transform (e.g. Damage.multiplier>=1.5)")
     
-    ships = data['Player'].get('spaceShips', [])
-    active_ship = None
-    ship_idx = None
+    def _candidates(self, data, catalog):
+        # Start from the narrowest catalog index a filter allows, then check
+        # every filter on each candidate once.
+        candidates = catalog.rows
+        for field, value in self.filters:
+            if field == 'type':
+                rows = catalog.by_type.get(value)
+            elif field == 'aspect':
+                rows = catalog.by_aspect.get(value)
+            elif field == 'name':
+                rows = catalog.rows_containing(value.lower())
+            elif field == 'ship':
+                rows = catalog.all_by_ship.get(self._ship_idx(data, value), [])
+            else:
+                continue
+            # Index keys are case-sensitive; on a miss the filter still scans.
+            if rows is not None and len(rows) < len(candidates):
+                candidates = rows
+        return candidates
     
-    for i, ship in enumerate(ships):
-        if ship.get('guid') == current_guid:
-            active_ship = ship
-            ship_idx = i
-            break
+    def _ship_idx(self, data, value):
+        if value.lower() == 'current':
+            return get_active_ship(data)[1]
+        return int(value) if value.isdigit() else None
     
+    def _compile_filter(self, data, field, value):
+        lowered = value.lower()
+        if field == 'name':
+            return lambda row: lowered in row.name.lower()
+        if field == 'type':
+            return lambda row: row.item.get('itemType', '').lower() == lowered
+        if field == 'slot':
+            return lambda row: lowered in row.slot.lower()
+        if field == 'aspect':
+            return lambda row: any(aspect.lower() == lowered for aspect in get_item_aspects(row.item))
+        if field == 'in':
+            return lambda row: row.kind == lowered
+        ship_idx = self._ship_idx(data, value)
+        return lambda row: row.ship_idx is not None and row.ship_idx == ship_idx
+    
+    def plan(self, data):
+        checks = [self._compile_filter(data, field, value) for field, value in self.filters]
+        changes = []
+        for row in self._candidates(data, get_item_catalog(data)):
+            if not all(check(row) for check in checks):
+                continue
+            for stat_idx, stat in enumerate(row.item.get('stats', [])):
+                if not isinstance(stat, dict):
+                    continue
+                stat_name = stat.get('stat', '').lower()
+                value_key = get_stat_value_key(stat)
+                old = new = stat.get(value_key, 0)
+                for name, key, operator, operand in self.transforms:
+                    if (name is None or name == stat_name) and (key is None or key == value_key):
+                        new = _STAT_OPERATORS[operator](new, operand)
+                if new != old:
+                    changes.append((row, stat_idx, value_key, old, new))
+        return changes
+    
+    def apply(self, data):
+        changes = self.plan(data)
+        if changes:
+            apply_edits(data, [('replace', row.path + ('stats', stat_idx, value_key), new)
+                               for row, stat_idx, value_key, _, new in changes], f"query {self.text}")
+        return changes
+
+
+def bulk_stats_menu(data):
+    print("\nFilters: name:TEXT (or a bare word), type:ITEMTYPE, slot:TEXT, aspect:NAME,")
+    print("         in:equipment|hardpoint|cargo|inventory, ship:current|INDEX")
+    print("Transforms: STAT[.multiplier|.amount] then = >= <= *= += and a number; STAT may be *")
+    print("Example: silverheart in:equipment Damage.multiplier>=1.5 *.amount*=2")
+    text = input("Query: ").strip()
+    if not text:
+        return
+    try:
+        query = StatQuery(text)
+    except ValueError as e:
+        print(e)
+        return
+    
+    changes = query.plan(data)
+    if not changes:
+        print("No stats match.")
+        return
+    print(f"\n{len(changes)} stat(s) on {len({id(row) for row, *_ in changes})} item(s) will change:")
+    for row, stat_idx, value_key, old, new in changes[:20]:
+        stat_name = row.item['stats'][stat_idx].get('stat', 'Unknown')
+        print(f"  {row.name} ({row.location}, {row.slot}) {stat_name}.{value_key}: {old:.2f} -> {new:.2f}")
+    if len(changes) > 20:
+        print(f"  ... and {len(changes) - 20} more")
+    
+    if input("Apply? [y/N]: ").strip().lower() == 'y':
+        query.apply(data)
+        print(f"Updated {len(changes)} stat(s). Undo with [u] in the main menu.")
+
+
+def get_active_ship(data):
+    ship = get_player(data).current_ship
+    if ship is None:
+        return None, None
+    return ship.node, ship.path[-1]
+
+
+def find_active_ship_items(data):
+    active_ship, ship_idx = get_active_ship(data)
     if not active_ship:
         return None, []
-    
-    items = []
-    ship_name = active_ship.get('customName', 'Active Ship')
-    eq = active_ship.get('equipment', {})
-    for slot, item in eq.items():
-        if item and isinstance(item, dict):
-            items.append({
-                'location': f'Ship {ship_idx} ({ship_name})',
-                'slot': f'Equipment: {slot}',
-                'name': item.get('displayName', 'Unknown'),
-                'ship_idx': ship_idx,
-                'slot_name': slot,
-                'item': item
-            })
-    
-    hardpoints = active_ship.get('hardpoints', [])
-    for hp_idx, item in enumerate(hardpoints):
-        if item and isinstance(item, dict):
-            items.append({
-                'location': f'Ship {ship_idx} ({ship_name})',
-                'slot': f'Hardpoint {hp_idx}',
-                'name': item.get('displayName', 'Unknown'),
-                'ship_idx': ship_idx,
-                'hp_idx': hp_idx,
-                'item': item
-            })
-    
-    return active_ship, items
+    return active_ship, get_item_catalog(data).by_ship.get(ship_idx, [])
 
 
 def get_item_aspects(item):
@@ -483,57 +3324,13 @@ def get_item_aspects(item):
 
 
 def get_active_ship_cargo(data):
-    current_guid = data.get('Player', {}).get('currentSpaceShip', '')
-    if not current_guid:
-        return None, []
-    
-    ships = data['Player'].get('spaceShips', [])
-    active_ship = None
-    
-    for ship in ships:
-        if ship.get('guid') == current_guid:
-            active_ship = ship
-            break
-    
+    active_ship, ship_idx = get_active_ship(data)
     if not active_ship:
         return None, []
-    
-    cargo_items = []
-    cargo_data = active_ship.get('cargo', {})
-    cargo_list = cargo_data.get('items', [])
-    
-    for idx, cargo_entry in enumerate(cargo_list):
-        if cargo_entry and isinstance(cargo_entry, dict):
-            item = cargo_entry.get('item')
-            count = cargo_entry.get('count', 1)
-            
-            if isinstance(item, dict):
-                name = item.get('displayName', 'Unknown')
-                aspects = get_item_aspects(item)
-                
-                if aspects:
-                    aspect_str = ', '.join(aspects)
-                    display_name = f"{name} (x{count}) [{aspect_str}]"
-                else:
-                    display_name = f"{name} (x{count})"
-                
-                cargo_items.append({
-                    'name': display_name,
-                    'cargo_idx': idx,
-                    'item': item
-                })
-            elif isinstance(item, str):
-                cargo_items.append({
-                    'name': f"{item} (x{count})",
-                    'cargo_idx': idx,
-                    'item': cargo_entry,
-                    'is_simple': True
-                })
-    
-    return active_ship, cargo_items
-
-
-def edit_cargo_quantity(cargo_entry):
+    return active_ship, get_item_catalog(data).cargo_by_ship.get(ship_idx, [])
+
+
+def edit_cargo_quantity(data, cargo_entry, path):
     current_count = cargo_entry.get('count', 1)
     item = cargo_entry.get('item')
     
@@ -552,7 +3349,7 @@ def edit_cargo_quantity(cargo_entry):
         try:
             new_count = int(new_value)
             if 1 <= new_count <= 99999:
-                cargo_entry['count'] = new_count
+                apply_edit(data, tuple(path) + ('count',), new_count, 'cargo')
                 print(f"Updated {item_name} quantity to {new_count}")
                 return
             else:
@@ -583,27 +3380,14 @@ def edit_active_ship_menu(data):
         if items:
             print(f"\n{ship_name} Equipment:")
             for idx, item_info in enumerate(items):
-                print(f"  {idx+1}. {item_info['name']} - {item_info['slot']}")
-                all_items.append({'type': 'equipment', 'data': item_info})
+                print(f"  {idx+1}. {item_info.name} - {item_info.slot}")
+                all_items.append(item_info)
         
-        cargo_start_idx = len(all_items)
         if cargo_items:
             print(f"\n{ship_name} Cargo:")
-            cargo_data = active_ship.get('cargo', {})
-            cargo_list = cargo_data.get('items', [])
-            for idx, cargo_info in enumerate(cargo_items):
-                cargo_entry = cargo_list[cargo_info['cargo_idx']]
-                count = cargo_entry.get('count', 1)
-                
-                if cargo_info.get('is_simple', False):
-                    item_name = str(cargo_entry.get('item', 'Unknown'))
-                elif isinstance(cargo_info['item'], dict):
-                    item_name = cargo_info['item'].get('displayName', 'Unknown')
-                else:
-                    item_name = str(cargo_info['item'])
-                
-                print(f"  {len(all_items)+1}. {item_name} (x{count})")
-                all_items.append({'type': 'cargo', 'data': cargo_info, 'cargo_entry': cargo_entry})
+            for cargo_info in cargo_items:
+                print(f"  {len(all_items)+1}. {cargo_info.item_name} (x{cargo_info.count})")
+                all_items.append(cargo_info)
         
         print("\n[1-{}] Select item | [z/Z] Back".format(len(all_items)))
         choice = input("Choice: ").strip().lower()
@@ -615,10 +3399,10 @@ def edit_active_ship_menu(data):
             item_idx = int(choice) - 1
             if 0 <= item_idx < len(all_items):
                 selected = all_items[item_idx]
-                if selected['type'] == 'equipment':
-                    edit_item_stats(selected['data']['item'])
-                elif selected['type'] == 'cargo':
-                    edit_cargo_quantity(selected['cargo_entry'])
+                if isinstance(selected, CargoRow):
+                    edit_cargo_quantity(data, selected.entry, selected.path)
+                else:
+                    edit_item_stats(data, selected.item, selected.path)
             else:
                 print("Invalid selection.")
         except ValueError:
@@ -626,6 +3410,10 @@ def edit_active_ship_menu(data):
 
 
 def get_armory_aspects(data):
+    return _cached_rows(data, 'armory_aspects', lambda: _build_aspect_rows(data))
+
+
+def _build_aspect_rows(data):
     armory_data = data.get('Player', {}).get('globalInventory', {})
     armory_items = armory_data.get('items', [])
     
@@ -634,15 +3422,7 @@ def get_armory_aspects(data):
         if entry and isinstance(entry, dict):
             item = entry.get('item')
             if isinstance(item, dict) and item.get('itemType') == 'Aspect':
-                aspect_name = item.get('aspectName', 'Unknown')
-                display_name = item.get('displayName', 'Unknown')
-                count = entry.get('count', 1)
-                aspects.append({
-                    'aspect_name': aspect_name,
-                    'display_name': display_name,
-                    'count': count,
-                    'armory_idx': idx
-                })
+                aspects.append(AspectRow(entry, idx, ('Player', 'globalInventory', 'items', idx)))
     
     return aspects
 
@@ -656,7 +3436,7 @@ def duplicate_aspect_menu(data):
         input("Press Enter to continue...")
         return
     
-    editable_items = [item for item in cargo_items if not item.get('is_simple', False)]
+    editable_items = [item for item in cargo_items if not item.is_simple]
     
     if not editable_items and not armory_aspects:
         print("\nNo items with aspects found.")
@@ -670,15 +3450,15 @@ def duplicate_aspect_menu(data):
     if editable_items:
         print("\n--- Cargo Items ---")
         for idx, item_info in enumerate(editable_items):
-            aspects = get_item_aspects(item_info['item'])
+            aspects = get_item_aspects(item_info.item)
             aspect_str = ', '.join(aspects) if aspects else 'No aspects'
-            print(f"  {len(all_sources)+1}. {item_info['item'].get('displayName', 'Unknown')} [{aspect_str}]")
+            print(f"  {len(all_sources)+1}. {item_info.item_name} [{aspect_str}]")
             all_sources.append({'type': 'cargo', 'data': item_info, 'idx': idx})
     
     if armory_aspects:
         print("\n--- Armory Aspects ---")
         for aspect_info in armory_aspects:
-            print(f"  {len(all_sources)+1}. {aspect_info['display_name']} (x{aspect_info['count']}) [{aspect_info['aspect_name']}]")
+            print(f"  {len(all_sources)+1}. {aspect_info.display_name} (x{aspect_info.count}) [{aspect_info.aspect_name}]")
             all_sources.append({'type': 'armory', 'data': aspect_info})
     
     source_choice = input("\nSelect SOURCE (number): ").strip()
@@ -699,7 +3479,7 @@ def duplicate_aspect_menu(data):
     source = all_sources[source_idx]
     
     if source['type'] == 'cargo':
-        source_item = source['data']['item']
+        source_item = source['data'].item
         source_aspects = get_item_aspects(source_item)
         
         if not source_aspects:
@@ -728,7 +3508,7 @@ def duplicate_aspect_menu(data):
         else:
             selected_aspect = source_aspects[0]
     else:
-        selected_aspect = source['data']['aspect_name']
+        selected_aspect = source['data'].aspect_name
         print(f"\nSelected aspect: {selected_aspect}")
     
     print(f"\nCopying aspect: {selected_aspect}")
@@ -745,9 +3525,9 @@ def duplicate_aspect_menu(data):
     
     print("\nAvailable TARGET Items:")
     for idx, item_info in enumerate(target_items):
-        aspects = get_item_aspects(item_info['item'])
+        aspects = get_item_aspects(item_info.item)
         aspect_str = ', '.join(aspects) if aspects else 'No aspects'
-        print(f"  {idx+1}. {item_info['item'].get('displayName', 'Unknown')} [{aspect_str}]")
+        print(f"  {idx+1}. {item_info.item_name} [{aspect_str}]")
     
     target_choice = input("\nSelect TARGET item (number): ").strip()
     if not target_choice:
@@ -764,7 +3544,8 @@ def duplicate_aspect_menu(data):
         input("Press Enter to continue...")
         return
     
-    target_item = target_items[target_idx]['item']
+    target_item = target_items[target_idx].item
+    target_path = target_items[target_idx].path
     target_aspects = get_item_aspects(target_item)
     aspect_slots = target_item.get('aspectSlots', [])
     
@@ -787,7 +3568,7 @@ def duplicate_aspect_menu(data):
                     slot_idx = i
                     break
             
-            aspect_slots[slot_idx]['equipAspect'] = selected_aspect
+            apply_edit(data, target_path + ('aspectSlots', slot_idx, 'equipAspect'), selected_aspect, 'aspect')
             print(f"\nReplaced '{target_aspects[overwrite_idx]}' with '{selected_aspect}'")
         except ValueError:
             print("Invalid input.")
@@ -795,17 +3576,21 @@ def duplicate_aspect_menu(data):
             return
     else:
         empty_slot = None
-        for slot in aspect_slots:
+        for i, slot in enumerate(aspect_slots):
             if isinstance(slot, dict) and (slot.get('equipAspect') is None or slot.get('equipAspect') == 'None'):
-                empty_slot = slot
+                empty_slot = i
                 break
         
-        if empty_slot:
-            empty_slot['equipAspect'] = selected_aspect
+        if empty_slot is not None:
+            apply_edit(data, target_path + ('aspectSlots', empty_slot, 'equipAspect'), selected_aspect, 'aspect')
             print(f"\nAdded aspect '{selected_aspect}' to target item.")
         else:
             if len(aspect_slots) < 2:
-                aspect_slots.append({'equipAspect': selected_aspect, 'index': str(len(aspect_slots))})
+                new_slot = {'equipAspect': selected_aspect, 'index': str(len(aspect_slots))}
+                if 'aspectSlots' in target_item:
+                    apply_edits(data, [('add', target_path + ('aspectSlots', '-'), new_slot)], 'aspect')
+                else:
+                    apply_edits(data, [('add', target_path + ('aspectSlots',), [new_slot])], 'aspect')
                 print(f"\nAdded aspect '{selected_aspect}' to new slot.")
             else:
                 print("\nError: Could not add aspect (no empty slots).")
@@ -821,7 +3606,7 @@ def edit_silverheart_menu(data):
         
         print("\nSilverheart Items:")
         for idx, si in enumerate(silverheart_items):
-            print(f"  {idx+1}. {si['name']} - {si['location']}, {si['slot']}")
+            print(f"  {idx+1}. {si.name} - {si.location}, {si.slot}")
         
         all_items = list(silverheart_items)
         current_idx = len(all_items)
@@ -831,21 +3616,17 @@ def edit_silverheart_menu(data):
             ship_name = active_ship.get('customName', 'Active Ship')
             for item_info in ship_items:
                 all_items.append(item_info)
-                print(f"  {current_idx+1}. {item_info['name']} - {item_info['slot']}")
+                print(f"  {current_idx+1}. {item_info.name} - {item_info.slot}")
                 current_idx += 1
         
-        cargo_data = active_ship.get('cargo', {}) if active_ship else {}
-        cargo_list = cargo_data.get('items', [])
-        
         if cargo_items:
             print("\n--- Active Ship Cargo ---")
             for cargo_info in cargo_items:
-                cargo_entry = cargo_list[cargo_info['cargo_idx']]
-                all_items.append({'type': 'cargo', 'data': cargo_info, 'cargo_entry': cargo_entry})
-                print(f"  {current_idx+1}. {cargo_info['name']}")
+                all_items.append(cargo_info)
+                print(f"  {current_idx+1}. {cargo_info.name}")
                 current_idx += 1
         
-        print("\n[1-{}] Select item to edit | [d/D] Duplicate Aspect | [z/Z] Back".format(len(all_items)))
+        print("\n[1-{}] Select item to edit | [d/D] Duplicate Aspect | [q/Q] Query Bulk Edit | [z/Z] Back".format(len(all_items)))
         choice = input("Choice: ").strip().lower()
         
         if choice == 'z':
@@ -853,87 +3634,291 @@ def edit_silverheart_menu(data):
         elif choice == 'd':
             duplicate_aspect_menu(data)
             continue
+        elif choice == 'q':
+            bulk_stats_menu(data)
+            continue
         
         try:
             item_idx = int(choice) - 1
             if 0 <= item_idx < len(all_items):
                 selected = all_items[item_idx]
-                if isinstance(selected, dict) and selected.get('type') == 'cargo':
-                    edit_cargo_quantity(selected['cargo_entry'])
+                if isinstance(selected, CargoRow):
+                    edit_cargo_quantity(data, selected.entry, selected.path)
                 else:
-                    edit_item_stats(selected['item'])
+                    edit_item_stats(data, selected.item, selected.path)
             else:
                 print("Invalid selection.")
         except ValueError:
             print("Invalid input.")
 
 
-def list_all_stations_menu(data):
-    stations = get_all_stations_with_materials(data)
+STATION_PAGE_SIZE = 12
+STATION_VIEW_LEVELS = ('stations', 'systems', 'zones')
+
+
+class StationListView:
+    # Pages over the station list MaterialTotals already keeps sorted by
+    # (zone, system, name). Each level is a flat row list built once, so a
+    # page is a slice of it and only the visible rows get formatted.
+    def __init__(self, totals, page_size=STATION_PAGE_SIZE):
+        self.totals = totals
+        self.stations = totals.stations
+        self.page_size = page_size
+        self.level = 'stations'
+        self.offset = 0
+        self._rows = {}
+        self._zones = {}
+    
+    def rows(self):
+        if self.level not in self._rows:
+            if self.level == 'stations':
+                rows = [(station['zone'], idx) for idx, station in enumerate(self.stations)]
+            else:
+                rows = []
+                for idx, station in enumerate(self.stations):
+                    key = (station['zone'],) if self.level == 'zones' else (station['zone'], station['system'])
+                    if rows and rows[-1][0] == key:
+                        rows[-1][2] += 1
+                    else:
+                        rows.append([key, idx, 1])
+                rows = [(key[0], key, first, count) for key, first, count in rows]
+            self._rows[self.level] = rows
+            self._zones[self.level] = [row[0] for row in rows]
+        return self._rows[self.level]
+    
+    def move(self, pages):
+        offset = self.offset + pages * self.page_size
+        if offset < len(self.rows()):
+            self.offset = max(offset, 0)
+    
+    def set_level(self, level):
+        # Stay on the zone that was at the top of the page.
+        zone = self.rows()[self.offset][0] if self.rows() else None
+        self.level = level
+        self.offset = 0
+        if zone is not None:
+            self.jump(zone)
     
-    if not stations:
+    def jump(self, zone):
+        rows = self.rows()
+        idx = bisect.bisect_left(self._zones[self.level], zone)
+        if idx < len(rows):
+            self.offset = idx
+    
+    def find_zone(self, text):
+        lowered = text.strip().lower()
+        zones = sorted(self.totals.by_zone)
+        for zone in zones:
+            if zone.lower() == lowered:
+                return zone
+        return next((zone for zone in zones if lowered in zone.lower()), None)
+    
+    def render(self):
+        rows = self.rows()
+        names = self.totals.names
+        page = rows[self.offset:self.offset + self.page_size]
+        lines = [f"\nStations with Material Storage ({len(self.stations)} found) - "
+                 f"{self.level} {self.offset + 1}-{self.offset + len(page)} of {len(rows)}",
+                 "=" * 80]
+        
+        current_zone = None
+        for row in page:
+            if self.level != 'zones' and row[0] != current_zone:
+                current_zone = row[0]
+                lines.append("\n" + "-" * 80)
+                lines.append(f"ZONE: {current_zone}")
+            
+            if self.level == 'stations':
+                idx = row[1]
+                station = self.stations[idx]
+                lines.append(f"\n{idx+1}. {station['name']} ({station['system']})")
+                lines.append(f"   Items ({len(station['items'])}):")
+                for item in station['items']:
+                    if item and isinstance(item, dict):
+                        item_id = item.get('item', '')
+                        lines.append(f"     - {names.get(item_id, item_id)}: {item.get('count', 0)}")
+            else:
+                _, key, first, count = row
+                totals = (self.totals.by_zone[key[0]] if self.level == 'zones'
+                          else self.totals.by_system[key])
+                label = f"ZONE {key[0]}" if self.level == 'zones' else f"  {key[1]}"
+                lines.append(f"{label}: {count} station(s) from #{first+1}, "
+                             f"{len(totals)} material(s), {sum(totals.values()):,} units")
+        lines.append("\n" + "=" * 80)
+        return '\n'.join(lines) + '\n'
+
+
+def list_all_stations_menu(data):
+    totals = get_material_totals(data)
+    if not totals.stations:
         print("\nNo stations with material storage found.")
         input("Press Enter to continue...")
         return
     
-    print(f"\nStations with Material Storage ({len(stations)} found):")
-    print("="*80)
+    view = StationListView(totals)
+    while True:
+        # One write per page instead of a print per line.
+        sys.stdout.write(view.render())
+        sys.stdout.flush()
+        choice = input("[n/N] Next | [p/P] Previous | [g/G] Go to zone | "
+                       "[c/C] Collapse/expand (stations > systems > zones) | [z/Z] Back: ").strip().lower()
+        if choice == 'z':
+            return
+        elif choice in ('n', ''):
+            view.move(1)
+        elif choice == 'p':
+            view.move(-1)
+        elif choice == 'c':
+            levels = STATION_VIEW_LEVELS
+            view.set_level(levels[(levels.index(view.level) + 1) % len(levels)])
+        elif choice == 'g':
+            zone = view.find_zone(input("Zone name: "))
+            if zone is None:
+                print("No such zone.")
+            else:
+                view.jump(zone)
+
+
+def find_material_menu(data):
+    totals = get_material_totals(data)
+    name = input("\nMaterial to find (id or name, e.g. Rich Lunorite): ").strip()
+    if not name:
+        return
     
-    current_zone = None
-    for idx, station in enumerate(stations):
-        if station['zone'] != current_zone:
-            current_zone = station['zone']
-            print("\n" + "-"*80)
-            print(f"ZONE: {current_zone}")
-            #rint("-"*80)
-        
-        print(f"\n{idx+1}. {station['name']} ({station['system']})")
-        print(f"   Items ({len(station['items'])}):")  
-        
-        for item in station['items']:
-            if item and isinstance(item, dict):
-                item_id = item.get('item', '')
-                count = item.get('count', 0)
-                display_name = ORE_CRYSTAL_NAMES.get(item_id, item_id)
-                print(f"     - {display_name}: {count}")
+    item_ids = totals.resolve_item_ids(name)
+    if not item_ids:
+        print(f"No stored material matches '{name}'.")
+        input("Press Enter to continue...")
+        return
     
-    print("\n" + "="*80)
+    for item_id in item_ids:
+        print(f"\n{totals.names[item_id]}: {totals.galaxy.get(item_id, 0):,} in total")
+        for zone, zone_totals in sorted(totals.by_zone.items()):
+            if zone_totals.get(item_id):
+                print(f"  ZONE {zone}: {zone_totals[item_id]:,}")
+        for station, count in totals.where(item_id):
+            print(f"     - {station['name']} ({station['system']}, {station['zone']}): {count:,}")
     input("\nPress Enter to continue...")
 
 
+def search_menu(data, query=''):
+    query = query or input("\nSearch items, cargo and station storage (name, id, type or aspect): ").strip()
+    if not query:
+        return
+    hits = get_search_index(data).search(query)
+    if not hits:
+        print(f"Nothing matches '{query}'.")
+        return
+    
+    shown = hits[:50]
+    print(f"\n{len(hits)} match(es) for '{query}':")
+    for idx, hit in enumerate(shown):
+        print(f"  {idx+1}. {hit.name} - {hit.where}")
+    if len(hits) > len(shown):
+        print(f"  ... {len(hits) - len(shown)} more, narrow the search to see them")
+    
+    choice = input(f"\n[1-{len(shown)}] Select to edit | [Enter] Back: ").strip()
+    if not choice:
+        return
+    try:
+        hit = shown[int(choice) - 1]
+    except (ValueError, IndexError):
+        print("Invalid selection.")
+        return
+    
+    if hit.kind == 'item':
+        edit_item_stats(data, hit.row.item, hit.row.path)
+    elif hit.kind == 'cargo':
+        edit_cargo_quantity(data, hit.row.entry, hit.row.path)
+    else:
+        new_value = input(f"Enter new amount for {hit.row.name} (current: {hit.row.count}, must be > 0): ").strip()
+        try:
+            if new_value and int(new_value) > 0:
+                set_material_amount(data, hit.row.item_ref, int(new_value), hit.row.path)
+                print(f"Updated {hit.row.name} to {int(new_value)}")
+            elif new_value:
+                print("Value must be greater than 0.")
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+
+
+def bulk_materials_menu(data):
+    pattern = input("\nMaterials to change (id or name, wildcards allowed, e.g. OreRare* or *Crystal): ").strip()
+    if not pattern:
+        return
+    columns = get_material_columns(data)
+    matched = columns.match(pattern)
+    if not matched:
+        print(f"No station holds a material matching '{pattern}'.")
+        return
+    print(f"Matches: {', '.join(columns.names[code] for code in matched)}")
+    
+    action = {'s': 'set', 'm': 'scale', 'f': 'fill'}.get(
+        input("[s/S] Set to N | [m/M] Multiply by K | [f/F] Fill up to N: ").strip().lower())
+    if action is None:
+        return
+    try:
+        value = float(input(f"{BULK_MATERIAL_ACTIONS[action].capitalize()}: ").strip())
+    except ValueError:
+        print("Invalid input. Please enter a number.")
+        return
+    if value <= 0:
+        print("Value must be greater than 0.")
+        return
+    
+    _, changes = plan_bulk_material_edit(data, pattern, action, value)
+    if not changes:
+        print("Nothing to change.")
+        return
+    
+    print(f"\n{len(changes)} station item(s) will change:")
+    for row, old, new in changes[:20]:
+        station = columns.stations[row]
+        print(f"  {station['name']} ({station['system']}, {station['zone']}) "
+              f"{columns.names[columns.codes[row]]}: {old:,} -> {new:,}")
+    if len(changes) > 20:
+        print(f"  ... and {len(changes) - 20} more")
+    print(f"Total change: {sum(new - old for _, old, new in changes):+,}")
+    
+    if input("Apply? [y/N]: ").strip().lower() == 'y':
+        apply_bulk_material_edit(data, pattern, action, value)
+        print(f"Updated {len(changes)} station item(s). Undo with [u] in the main menu.")
+
+
 def edit_materials_menu(data):
     while True:
         materials = get_material_storage(data)
         
-        if not materials:
+        if materials:
+            print("\nMaterial Storage (Ores & Crystals):")
+            for idx, mat in enumerate(materials):
+                print(f"  {idx+1}. {mat.name}: {mat.count}")
+            print(f"\n[1-{len(materials)}] Select material to edit | [b/B] Bulk edit all stations | [z/Z] Back")
+        else:
             print("\nNo material storage found in current station.")
-            input("Press Enter to continue...")
-            return
-        
-        print("\nMaterial Storage (Ores & Crystals):")
-        for idx, mat in enumerate(materials):
-            print(f"  {idx+1}. {mat['name']}: {mat['count']}")
-        
-        print(f"\n[1-{len(materials)}] Select material to edit | [z/Z] Back")
+            print("\n[b/B] Bulk edit all stations | [z/Z] Back")
         choice = input("Choice: ").strip().lower()
         
         if choice == 'z':
             break
+        if choice == 'b':
+            bulk_materials_menu(data)
+            continue
         
         try:
             mat_idx = int(choice) - 1
             if 0 <= mat_idx < len(materials):
                 mat = materials[mat_idx]
                 while True:
-                    new_value = input(f"Enter new amount for {mat['name']} (current: {mat['count']}, must be > 0): ").strip()
+                    new_value = input(f"Enter new amount for {mat.name} (current: {mat.count}, must be > 0): ").strip()
                     if not new_value:
                         break
                     
                     try:
                         new_amount = int(new_value)
                         if new_amount > 0:
-                            set_material_amount(data, mat['item_ref'], new_amount)
-                            print(f"Updated {mat['name']} to {new_amount}")
+                            set_material_amount(data, mat.item_ref, new_amount, mat.path)
+                            print(f"Updated {mat.name} to {new_amount}")
                             break
                         else:
                             print("Value must be greater than 0.")
@@ -945,27 +3930,673 @@ def edit_materials_menu(data):
             print("Invalid input.")
 
 
+def resolve_faction_id(name):
+    lowered = name.strip().lower()
+    for faction_id, display_name in FACTION_NAMES.items():
+        if lowered in (faction_id.lower(), display_name.lower()):
+            return faction_id
+    return name.strip()
+
+
+def find_pois(data, name):
+    if name.lower() == 'current':
+        name = data.get('Player', {}).get('currentPointOfInterest', '')
+    
+    index = get_guid_index(data)
+    entry = index.get(name)
+    if entry is not None and entry['kind'] == 'poi':
+        return [entry]
+    lowered = name.lower()
+    return [entry for entry in index.values()
+            if entry['kind'] == 'poi' and entry['name'].lower() == lowered]
+
+
+def _split_assignment(spec, with_target):
+    # 'Faction=value' or 'TARGET:key=value'
+    left, sep, value = spec.rpartition('=')
+    if not sep or not left:
+        raise ValueError(f"expected '=' in {spec!r}")
+    if not with_target:
+        return left, value
+    target, sep, key = left.rpartition(':')
+    if not sep or not target or not key:
+        raise ValueError(f"expected 'TARGET:key=value', got {spec!r}")
+    return target, key, value
+
+
+def parse_batch_operations(args):
+    operations = []
+    if args.add_credits:
+        operations.append(('add_credits', args.add_credits))
+    for spec in args.set_rep or []:
+        faction, value = _split_assignment(spec, with_target=False)
+        reputation = int(value)
+        if not REPUTATION_MIN <= reputation <= REPUTATION_MAX:
+            raise ValueError(f"reputation for {faction} must be between {REPUTATION_MIN} and {REPUTATION_MAX}")
+        operations.append(('set_rep', resolve_faction_id(faction), reputation))
+    for spec in args.set_material or []:
+        poi, item, value = _split_assignment(spec, with_target=True)
+        if int(value) <= 0:
+            raise ValueError(f"material amount for {item} must be greater than 0")
+        operations.append(('set_material', poi, item, int(value)))
+    for spec in args.set_stat or []:
+        item, stat, value = _split_assignment(spec, with_target=True)
+        operations.append(('set_stat', item, stat, float(value)))
+    for text in args.stat_query or []:
+        operations.append(('stat_query', StatQuery(text)))
+    for filename in args.apply_patch or []:
+        operations.append(('apply_patch', filename, load_patch(filename)))
+    return operations
+
+
+def apply_batch_operations(data, operations):
+    messages = []
+    for op in operations:
+        if op[0] == 'add_credits':
+            credits = get_player_credits(data) + op[1]
+            set_player_credits(data, credits)
+            messages.append(f"credits -> {credits:,}")
+        
+        elif op[0] == 'set_rep':
+            _, faction_id, reputation = op
+            relation = get_player(data).relation('Player', faction_id)
+            matched = [relation] if relation is not None else []
+            for faction in matched:
+                apply_edit(data, faction.path + ('reputation',), reputation, 'reputation')
+            messages.append(f"{FACTION_NAMES.get(faction_id, faction_id)} -> {reputation:,}" if matched
+                            else f"faction {faction_id} not found")
+        
+        elif op[0] == 'set_material':
+            _, poi_name, item_name, amount = op
+            updated = 0
+            for entry in find_pois(data, poi_name):
+                poi = resolve_path(data, entry['path'])
+                for idx, item in enumerate(poi.get('materialStorage', {}).get('items', [])):
+                    item_id = item.get('item', '')
+                    if item_name.lower() in (item_id.lower(), ORE_CRYSTAL_NAMES.get(item_id, '').lower()):
+                        set_material_amount(data, item, amount,
+                                            entry['path'] + ('materialStorage', 'items', idx))
+                        updated += 1
+            messages.append(f"{poi_name}:{item_name} -> {amount} ({updated} updated)")
+        
+        elif op[0] == 'set_stat':
+            _, item_name, stat_name, value = op
+            updated = 0
+            for row in get_item_catalog(data).rows:
+                if item_name.lower() not in row.name.lower():
+                    continue
+                for stat_idx, stat in enumerate(row.item.get('stats', [])):
+                    if stat.get('stat', '').lower() == stat_name.lower():
+                        apply_edit(data, row.path + ('stats', stat_idx, get_stat_value_key(stat)), value, 'stat')
+                        updated += 1
+            messages.append(f"{item_name}:{stat_name} -> {value} ({updated} updated)")
+        
+        elif op[0] == 'stat_query':
+            changes = op[1].apply(data)
+            messages.append(f"{op[1].text}: {len(changes)} stat(s) updated")
+        
+        elif op[0] == 'apply_patch':
+            _, filename, patch = op
+            applied = apply_patch(data, patch, label=filename)
+            messages.append(f"{filename}: {len(applied)} operation(s) applied")
+    return messages
+
+
+def _batch_process_file(path, operations, output_dir, compresslevel, backup_keep=BACKUP_KEEP):
+    start = time.perf_counter()
+    try:
+        data = load_savegame(path, lazy=True)
+        messages = apply_batch_operations(data, operations)
+        problems = validate_savegame(data)
+        if problems:
+            # Leave the file alone rather than write something the game rejects.
+            more = f" (+{len(problems) - 3} more)" if len(problems) > 3 else ""
+            return {'path': path, 'ok': False, 'seconds': time.perf_counter() - start, 'size': 0,
+                    'error': f"not saved, {len(problems)} validation problem(s): "
+                             f"{'; '.join(problems[:3])}{more}"}
+        output = os.path.join(output_dir, os.path.basename(path)) if output_dir else path
+        save_savegame(output, data, compresslevel=compresslevel, backup_keep=backup_keep)
+    except Exception as e:
+        return {'path': path, 'ok': False, 'error': f"{type(e).__name__}: {e}",
+                'seconds': time.perf_counter() - start, 'size': 0}
+    return {'path': path, 'ok': True, 'messages': messages, 'output': output,
+            'seconds': time.perf_counter() - start, 'size': os.path.getsize(path)}
+
+
+def run_batch(patterns, operations, jobs=None, output_dir=None, compresslevel=SAVE_COMPRESSLEVEL,
+              backup_keep=BACKUP_KEEP):
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)
+                    if os.path.isfile(path)})
+    if not paths:
+        print("No save files matched.")
+        return 1
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    jobs = jobs or os.cpu_count() or 1
+    print(f"Processing {len(paths)} file(s) with {min(jobs, len(paths))} worker(s)...")
+    start = time.perf_counter()
+    failures = 0
+    total_size = 0
+    
+    # One file per worker: each save is loaded, edited and written inside
+    # its own process, so only the small result dict crosses back.
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_batch_process_file, path, operations, output_dir, compresslevel, backup_keep)
+                   for path in paths]
+        for future in futures:
+            result = future.result()
+            if result['ok']:
+                total_size += result['size']
+                rate = result['size'] / 1e6 / result['seconds'] if result['seconds'] else 0
+                print(f"  OK   {result['path']} -> {result['output']} "
+                      f"({result['seconds']:.2f}s, {rate:.1f} MB/s)")
+                for message in result['messages']:
+                    print(f"         {message}")
+            else:
+                failures += 1
+                print(f"  FAIL {result['path']} ({result['seconds']:.2f}s): {result['error']}")
+    
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(paths) - failures}/{len(paths)} file(s) in {elapsed:.2f}s "
+          f"({len(paths) / elapsed:.2f} files/s, {total_size / 1e6 / elapsed:.1f} MB/s)")
+    return 1 if failures else 0
+
+
+def _peek(items, idx):
+    return items.peek(idx) if isinstance(items, LazyList) else items[idx]
+
+
+def _iter_aligned(old_list, new_list, key, compare):
+    # Walk both lists in step, one parsed element of each alive at a time;
+    # elements that moved are matched by key as the walks go. Both saves'
+    # decompressed texts still stay in memory for the whole diff.
+    old_left = {}
+    new_left = {}
+    for idx in range(max(len(old_list), len(new_list))):
+        old = _peek(old_list, idx) if idx < len(old_list) else None
+        new = _peek(new_list, idx) if idx < len(new_list) else None
+        old_key = key(old) if old is not None else None
+        new_key = key(new) if new is not None else None
+        if old is not None and old_key == new_key:
+            yield from compare(old, new)
+            continue
+        if old is not None:
+            if old_key in new_left:
+                yield from compare(old, new_left.pop(old_key))
+            else:
+                old_left[old_key] = old
+        if new is not None:
+            if new_key in old_left:
+                yield from compare(old_left.pop(new_key), new)
+            else:
+                new_left[new_key] = new
+    for old_key, old in old_left.items():
+        yield from compare(old, None)
+    for new_key, new in new_left.items():
+        yield from compare(None, new)
+
+
+def _change(kind, where, old, new, key=None):
+    return {'kind': kind, 'where': where, 'old': old, 'new': new, 'key': key}
+
+
+def _sector_stations(sector):
+    stations = {}
+    for system in (sector or {}).get('systems', []):
+        for poi in system.get('pointsOfInterest', []):
+            items = poi.get('materialStorage', {}).get('items', [])
+            if items:
+                counts = {item.get('item', ''): item.get('count', 0) for item in items if isinstance(item, dict)}
+                stations[poi.get('guid', '')] = (poi.get('name', 'Unknown'), counts)
+    return stations
+
+
+def _diff_stations(old_stations, new_stations):
+    for guid in list(old_stations) + [g for g in new_stations if g not in old_stations]:
+        old_name, old_counts = old_stations.get(guid, (None, {}))
+        new_name, new_counts = new_stations.get(guid, (None, {}))
+        name = new_name or old_name
+        for item_id in list(old_counts) + [i for i in new_counts if i not in old_counts]:
+            if old_counts.get(item_id) != new_counts.get(item_id):
+                yield _change('material', f"{name}: {ORE_CRYSTAL_NAMES.get(item_id, item_id)}",
+                              old_counts.get(item_id), new_counts.get(item_id), key=(guid, item_id))
+
+
+def _diff_sectors(old, new):
+    # Stations are aligned by POI GUID inside each pair of sectors.
+    yield from _diff_stations(_sector_stations(old), _sector_stations(new))
+
+
+def _item_summary(item):
+    if not isinstance(item, dict):
+        return {'name': str(item), 'stats': {}, 'aspects': []}
+    stats = {}
+    for stat in item.get('stats', []):
+        if isinstance(stat, dict):
+            stats[stat.get('stat', 'Unknown')] = stat.get(get_stat_value_key(stat))
+    return {'name': item.get('displayName', 'Unknown'), 'stats': stats,
+            'aspects': get_item_aspects(item)}
+
+
+def _diff_item(where, old, new):
+    if old is None or new is None:
+        yield _change('item', where, old and _item_summary(old)['name'], new and _item_summary(new)['name'])
+        return
+    old_summary = _item_summary(old)
+    new_summary = _item_summary(new)
+    if old_summary['name'] != new_summary['name']:
+        yield _change('item', where, old_summary['name'], new_summary['name'])
+        return
+    where = f"{where} {new_summary['name']}"
+    for stat in list(old_summary['stats']) + [s for s in new_summary['stats'] if s not in old_summary['stats']]:
+        if old_summary['stats'].get(stat) != new_summary['stats'].get(stat):
+            yield _change('stat', f"{where}: {stat}", old_summary['stats'].get(stat),
+                          new_summary['stats'].get(stat))
+    if old_summary['aspects'] != new_summary['aspects']:
+        yield _change('aspects', where, old_summary['aspects'], new_summary['aspects'])
+
+
+def _ship_slots(ship):
+    slots = {}
+    for slot, item in (ship or {}).get('equipment', {}).items():
+        if item:
+            slots[f'Equipment: {slot}'] = (item, None)
+    for hp_idx, item in enumerate((ship or {}).get('hardpoints', [])):
+        if item:
+            slots[f'Hardpoint {hp_idx}'] = (item, None)
+    for cargo_idx, entry in enumerate((ship or {}).get('cargo', {}).get('items', [])):
+        if isinstance(entry, dict):
+            slots[f'Cargo {cargo_idx}'] = (entry.get('item'), entry.get('count', 1))
+    return slots
+
+
+def _diff_slots(label, old_slots, new_slots):
+    for slot in list(old_slots) + [s for s in new_slots if s not in old_slots]:
+        old_item, old_count = old_slots.get(slot, (None, None))
+        new_item, new_count = new_slots.get(slot, (None, None))
+        where = f"{label}, {slot}"
+        if old_item == new_item and old_count == new_count:
+            continue
+        yield from _diff_item(where, old_item, new_item)
+        if old_item is not None and new_item is not None and old_count != new_count:
+            yield _change('count', f"{where} {_item_summary(new_item)['name']}", old_count, new_count)
+
+
+def _diff_ships(old, new):
+    ship = new if new is not None else old
+    label = ship.get('customName') or f"Ship ({ship.get('type', 'Unknown')})"
+    yield from _diff_slots(label, _ship_slots(old), _ship_slots(new))
+
+
+def _global_inventory_slots(data):
+    global_inv = data.get('Player', {}).get('globalInventory', [])
+    slots = {}
+    if isinstance(global_inv, dict):
+        for idx, entry in enumerate(global_inv.get('items', [])):
+            if isinstance(entry, dict):
+                slots[f'Index {idx}'] = (entry.get('item'), entry.get('count', 1))
+    else:
+        for idx, item in enumerate(global_inv):
+            if item:
+                slots[f'Index {idx}'] = (item, None)
+    return slots
+
+
+def diff_savegames(old, new):
+    old_credits = get_player_credits(old)
+    new_credits = get_player_credits(new)
+    if old_credits != new_credits:
+        yield _change('credits', 'Credits', old_credits, new_credits)
+    
+    old_factions = {f.faction_id: f.reputation for f in get_player_factions(old)}
+    new_factions = {f.faction_id: f.reputation for f in get_player_factions(new)}
+    for faction_id in list(old_factions) + [f for f in new_factions if f not in old_factions]:
+        if old_factions.get(faction_id) != new_factions.get(faction_id):
+            yield _change('reputation', FACTION_NAMES.get(faction_id, faction_id),
+                          old_factions.get(faction_id), new_factions.get(faction_id))
+    
+    def sectors(data):
+        return data.get('Player', {}).get('map', {}).get('sectors', [])
+    
+    def ships(data):
+        return data.get('Player', {}).get('spaceShips', [])
+    
+    def sector_key(sector):
+        return sector.get('guid') or sector.get('name')
+    
+    def ship_key(ship):
+        return ship.get('guid')
+    
+    # A station whose sector moved shows up as removed in one pair and added
+    # in another; merge those back together by POI GUID and material before
+    # reporting, so two stations sharing a name are never mixed up.
+    moved = {}
+    for change in _iter_aligned(sectors(old), sectors(new), sector_key, _diff_sectors):
+        key = change['key']
+        if key in moved:
+            first = moved.pop(key)
+            merged = _change('material', change['where'],
+                             first['old'] if first['old'] is not None else change['old'],
+                             first['new'] if first['new'] is not None else change['new'], key=key)
+            if merged['old'] != merged['new']:
+                yield merged
+        elif change['old'] is None or change['new'] is None:
+            moved[key] = change
+        else:
+            yield change
+    yield from moved.values()
+    
+    yield from _iter_aligned(ships(old), ships(new), ship_key, _diff_ships)
+    yield from _diff_slots('Global Inventory', _global_inventory_slots(old), _global_inventory_slots(new))
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return f"{value:.3f}".rstrip('0').rstrip('.')
+    if isinstance(value, int):
+        return f"{value:,}"
+    if isinstance(value, list):
+        return '[' + ', '.join(value) + ']'
+    return '-' if value is None else str(value)
+
+
+def print_savegame_diff(old_filename, new_filename):
+    old = load_savegame(old_filename, lazy=True)
+    new = load_savegame(new_filename, lazy=True)
+    changes = 0
+    for change in diff_savegames(old, new):
+        changes += 1
+        print(f"  [{change['kind']}] {change['where']}: "
+              f"{_format_value(change['old'])} -> {_format_value(change['new'])}")
+    print(f"\n{changes} change(s) between {old_filename} and {new_filename}")
+    return changes
+
+
+# Functions timed by --profile, as (phase, module-level name). Timings are
+# inclusive, so 'load' contains 'decompress' and 'parse'. Nothing is wrapped
+# unless --profile is given.
+PROFILED_FUNCTIONS = (
+    ('load', 'load_savegame'),
+    ('decompress', 'read_save_text'),
+    ('parse', 'parse_savegame_lazy'),
+    ('decode', 'decode_json'),
+    ('guid index', 'build_guid_index'),
+    ('material rows', '_build_material_rows'),
+    ('station totals', 'get_material_totals'),
+    ('faction rows', '_build_faction_rows'),
+    ('item catalog', 'get_item_catalog'),
+    ('aspect rows', '_build_aspect_rows'),
+    ('diff', 'diff_savegames'),
+    ('save', 'save_savegame'),
+    ('encode', '_encode_json'),
+    ('compress', '_write_gzip_parallel'),
+)
+
+
+class Profiler:
+    def __init__(self, cprofile_output=None):
+        import tracemalloc
+        self._tracemalloc = tracemalloc
+        self.stats = {}
+        # Frames nest per thread, but the heap peak is process-wide, so it
+        # is folded into the open frames of every thread.
+        self._local = threading.local()
+        self._open = {}
+        self._lock = threading.Lock()
+        self._cprofile = None
+        self._cprofile_output = cprofile_output
+        tracemalloc.start()
+        if cprofile_output:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        
+        module = globals()
+        for phase, name in PROFILED_FUNCTIONS:
+            module[name] = self._wrap(phase, module[name])
+    
+    def _heap_peak(self):
+        # Python 3.8 has no tracemalloc.reset_peak; there the peak column
+        # falls back to the heap size seen at phase boundaries.
+        tracemalloc = self._tracemalloc
+        if hasattr(tracemalloc, 'reset_peak'):
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            return peak
+        return tracemalloc.get_traced_memory()[0]
+    
+    def _wrap(self, phase, func):
+        def timed(*args, **kwargs):
+            stack = getattr(self._local, 'stack', None)
+            if stack is None:
+                stack = self._local.stack = []
+            frame = [0]
+            with self._lock:
+                # tracemalloc has one peak counter; fold it into every open
+                # phase before resetting it so nested calls and other
+                # threads don't hide an outer peak.
+                current_peak = self._heap_peak()
+                for open_frame in self._open.values():
+                    open_frame[0] = max(open_frame[0], current_peak)
+                self._open[id(frame)] = frame
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                with self._lock:
+                    current_peak = self._heap_peak()
+                    for open_frame in self._open.values():
+                        open_frame[0] = max(open_frame[0], current_peak)
+                    del self._open[id(frame)]
+                    peak = frame[0]
+                    if stack:
+                        stack[-1][0] = max(stack[-1][0], peak)
+                    stat = self.stats.setdefault(phase, {'calls': 0, 'total': 0.0, 'max': 0.0, 'peak': 0})
+                    stat['calls'] += 1
+                    stat['total'] += elapsed
+                    stat['max'] = max(stat['max'], elapsed)
+                    stat['peak'] = max(stat['peak'], peak)
+        timed.__wrapped__ = func
+        return timed
+    
+    def report(self, out=None):
+        out = out or sys.stderr
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self._cprofile_output)
+        
+        print(f"\n{'phase':<16} {'calls':>6} {'total':>10} {'max':>10} {'peak heap':>11}", file=out)
+        for phase, _ in PROFILED_FUNCTIONS:
+            stat = self.stats.get(phase)
+            if stat:
+                print(f"{phase:<16} {stat['calls']:>6} {stat['total']:>9.3f}s {stat['max']:>9.3f}s "
+                      f"{stat['peak'] / 1e6:>9.1f}MB", file=out)
+        
+        current, peak = self._tracemalloc.get_traced_memory()
+        print(f"\nHeap now {current / 1e6:.1f}MB. Largest allocation sites:", file=out)
+        snapshot = self._tracemalloc.take_snapshot().filter_traces(
+            (self._tracemalloc.Filter(False, self._tracemalloc.__file__),))
+        for stat in snapshot.statistics('lineno')[:5]:
+            frame = stat.traceback[0]
+            print(f"  {stat.size / 1e6:>7.1f}MB {os.path.basename(frame.filename)}:{frame.lineno}", file=out)
+        self._tracemalloc.stop()
+        if self._cprofile is not None:
+            print(f"cProfile stats written to {self._cprofile_output}", file=out)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Vanguard Galaxy savegame editor")
+    parser.add_argument('filename', nargs='?', help="save file to edit interactively")
+    parser.add_argument('--cache', action='store_true',
+                        help=f"keep decompressed saves in {DECOMPRESSED_CACHE_DIR} so reopening skips gunzip")
+    parser.add_argument('--json-backend', choices=JSON_BACKENDS,
+                        help="force a JSON library (default: fastest installed)")
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'),
+                        help="list credits, reputation, material and item changes between two saves")
+    parser.add_argument('--backups', type=int, default=BACKUP_KEEP, metavar='N',
+                        help=f"snapshots kept per save in {BACKUP_DIR_NAME}/ before overwriting (0 disables)")
+    parser.add_argument('--compresslevel', type=int, default=SAVE_COMPRESSLEVEL, choices=range(1, 10),
+                        help=f"gzip level for saves and checkpoints (default: {SAVE_COMPRESSLEVEL}; 9 is smallest and slowest)")
+    parser.add_argument('--list-backups', metavar='SAVE',
+                        help=f"list the snapshots of SAVE kept in {BACKUP_DIR_NAME}/")
+    parser.add_argument('--restore', nargs=2, metavar=('SAVE', 'N'),
+                        help="put snapshot N from --list-backups back in place of SAVE")
+    parser.add_argument('--profile', action='store_true',
+                        help="time load, menu scans and save, and print a summary at exit")
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help="also write cProfile stats to FILE (implies --profile)")
+    parser.add_argument('--watch', action='store_true',
+                        help="reload the newest save in the save's directory whenever the game writes one")
+    parser.add_argument('--pin', action='append', metavar='PATCH.json',
+                        help="edits to apply on load and reapply to every save --watch loads (repeatable)")
+    parser.add_argument('--watch-interval', type=float, default=WATCH_INTERVAL, metavar='SECONDS',
+                        help=f"how often --watch polls for new saves (default: {WATCH_INTERVAL})")
+    
+    batch = parser.add_argument_group("batch mode (no prompts)")
+    batch.add_argument('--batch', nargs='+', metavar='GLOB',
+                       help="apply the edits below to every matching .save file")
+    batch.add_argument('--add-credits', type=int, metavar='N')
+    batch.add_argument('--set-rep', action='append', metavar='FACTION=VALUE',
+                       help="faction id or display name, e.g. 'Canisec=15000'")
+    batch.add_argument('--set-material', action='append', metavar='POI:ITEM=COUNT',
+                       help="POI guid, name or 'current'; item id or display name")
+    batch.add_argument('--set-stat', action='append', metavar='ITEM:STAT=VALUE',
+                       help="every item whose displayName contains ITEM")
+    batch.add_argument('--stat-query', action='append', metavar='QUERY',
+                       help="bulk stat edit, e.g. 'silverheart in:equipment Damage.multiplier>=1.5'")
+    batch.add_argument('--apply-patch', action='append', metavar='PATCH.json',
+                       help="replay a patch exported from the editor with [x]")
+    batch.add_argument('--jobs', type=int, help="worker processes (default: one per CPU)")
+    batch.add_argument('--output-dir', help="write results here instead of in place")
+    return parser, parser.parse_args(argv)
+
+
+def ask_save_filename(default='CHEATX.save'):
+    output_filename = input(f"\nEnter save filename (default: {default}): ").strip() or default
+    if not output_filename.endswith('.save'):
+        output_filename += '.save'
+    return output_filename
+
+
+def report_background_save(save):
+    if save.error is not None:
+        print(f"\nSaving {save.filename} FAILED: {save.error}")
+    elif save.problems:
+        print(f"\nNot saved to {save.filename}: {len(save.problems)} problem(s) found in the edited save:")
+        for problem in save.problems[:20]:
+            print(f"  {problem}")
+        if len(save.problems) > 20:
+            print(f"  ... and {len(save.problems) - 20} more")
+    else:
+        print(f"\nSaved to {save.filename} ({save.snapshot.size / 1e6:.1f} MB in {save.seconds:.1f}s)")
+
+
+def _print_save_progress(save):
+    if save.stage == 'validating':
+        sys.stdout.write(f"\rChecking {save.filename}...")
+    else:
+        sys.stdout.write(f"\rSaving {save.filename}: {save.progress:.0%}")
+    sys.stdout.flush()
+
+
 def display_info(credits, factions):
     print(f"\nCredits: {credits:,}")
     print("\nPlayer Faction Reputations:")
     for faction in factions:
-        print(f"  {faction['faction']}: {faction['reputation']:,} - {faction['tier']}")
+        print(f"  {faction.faction}: {faction.reputation:,} - {faction.tier}")
 
 
 def main():
-    if len(sys.argv) >= 2:
-        filename = sys.argv[1]
+    parser, args = parse_args()
+    if args.json_backend:
+        try:
+            set_json_backend(args.json_backend)
+        except ImportError as e:
+            parser.error(str(e))
+    if args.profile or args.profile_output:
+        atexit.register(Profiler(args.profile_output).report)
+    if args.diff:
+        print_savegame_diff(*args.diff)
+        return
+    if args.list_backups:
+        print_backups(args.list_backups)
+        return
+    if args.restore:
+        restore_filename, number = args.restore
+        entries = list_backups(restore_filename)
+        if not number.isdigit() or not 1 <= int(number) <= len(entries):
+            parser.error(f"--restore: {restore_filename} has {len(entries)} backup(s); see --list-backups")
+        entry = entries[-int(number)]
+        restore_backup(restore_filename, entry['sha256'], keep=max(args.backups, len(entries) + 1))
+        print(f"Restored {restore_filename} from the backup of "
+              f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['time']))}; "
+              f"the replaced version was backed up first.")
+        return
+    if args.batch:
+        try:
+            operations = parse_batch_operations(args)
+        except ValueError as e:
+            parser.error(str(e))
+        if not operations:
+            parser.error("--batch needs at least one edit")
+        sys.exit(run_batch(args.batch, operations, args.jobs, args.output_dir, args.compresslevel, args.backups))
+    
+    if args.filename:
+        filename = args.filename
     else:
         filename = select_save_file()
     
-    data = load_savegame(filename)
+    data = load_savegame(filename, lazy=True, cache=args.cache)
+    for patch_filename in args.pin or ():
+        try:
+            applied, skipped = reapply_pinned(data, load_patch(patch_filename))
+        except (OSError, ValueError) as e:
+            parser.error(f"--pin {patch_filename}: {e}")
+        print(f"Pinned {len(applied)} edit(s) from {patch_filename}" +
+              (f", skipped {len(skipped)} that do not fit this save" if skipped else ""))
     credits = get_player_credits(data)
     factions = get_player_factions(data)
     
     display_info(credits, factions)
+    checkpoint = None
+    last_output = 'CHEATX.save'
+    source_backed_up = False
+    watcher = None
+    if args.watch:
+        watcher = SaveWatcher(os.path.dirname(os.path.abspath(filename)), interval=args.watch_interval)
+        print(f"Watching {watcher.directory} for new saves; edits made here are reapplied to them.")
     
     while True:
-        choice = input("\n[+] Add 1M Credits | [e/E] Edit Items | [f/F] Edit Factions | [m/M] Material Storage | [!] List All Stations | [s/S] Save | [q/Q] Quit: ").strip()
+        reload = watcher.take() if watcher is not None else None
+        if reload is not None and reload.data is not None:
+            pinned = export_patch(data)
+            if pinned != reload.pinned:
+                # Edits made while it was loading.
+                if reload.applied:
+                    undo_edit(reload.data)
+                reload.applied, reload.skipped = reapply_pinned(reload.data, pinned)
+            data, filename = reload.data, reload.filename
+            source_backed_up = False
+            print(f"\n{reload.summary()}")
+            for op, e in reload.skipped[:5]:
+                print(f"  skipped {op['op']} {op['path']}: {e}")
+            credits = get_player_credits(data)
+            factions = get_player_factions(data)
+            display_info(credits, factions)
+        if watcher is not None:
+            watcher.pinned = export_patch(data)
+        if checkpoint is not None and checkpoint.done():
+            report_background_save(checkpoint)
+            checkpoint = None
+        status = ""
+        if checkpoint is not None:
+            status = (f" [checking {checkpoint.filename}]" if checkpoint.stage == 'validating'
+                      else f" [saving {checkpoint.filename}: {checkpoint.progress:.0%}]")
+        choice = input(f"\n[+] Add 1M Credits | [e/E] Edit Items | [f/F] Edit Factions | [m/M] Material Storage | [!] List All Stations | [w/W] Where Is Material | [/] Search | [u/U] Undo | [r/R] Redo | [x/X] Export Patch | [p/P] Apply Patch | [c/C] Checkpoint | [s/S] Save | [q/Q] Quit{status}: ").strip()
         if choice == '+':
             credits += 1000000
             set_player_credits(data, credits)
@@ -983,16 +4614,79 @@ def main():
         elif choice == '!':
             list_all_stations_menu(data)
             display_info(credits, factions)
-        elif choice.lower() == 's':
-            output_filename = input("\nEnter save filename (default: CHEATX.save): ").strip()
-            if not output_filename:
-                output_filename = 'CHEATX.save'
-            if not output_filename.endswith('.save'):
-                output_filename += '.save'
-            save_savegame(output_filename, data)
-            print(f"Saved to {output_filename}")
+        elif choice.lower() == 'w':
+            find_material_menu(data)
+            display_info(credits, factions)
+        elif choice.startswith('/'):
+            search_menu(data, choice[1:].strip())
+            display_info(credits, factions)
+        elif choice.lower() in ('u', 'r'):
+            label = undo_edit(data) if choice.lower() == 'u' else redo_edit(data)
+            if label is None:
+                print("Nothing to undo." if choice.lower() == 'u' else "Nothing to redo.")
+            else:
+                print(f"{'Undid' if choice.lower() == 'u' else 'Redid'} {label}.")
+                credits = get_player_credits(data)
+                display_info(credits, factions)
+        elif choice.lower() == 'x':
+            patch_filename = input("\nEnter patch filename (default: edits.patch.json): ").strip() or 'edits.patch.json'
+            save_patch(patch_filename, data)
+            print(f"Exported {count_patch_edits(export_patch(data))} edit(s) to {patch_filename}")
+        elif choice.lower() == 'p':
+            patch_filename = input("\nEnter patch filename: ").strip()
+            if patch_filename:
+                try:
+                    applied = apply_patch(data, load_patch(patch_filename), label=patch_filename)
+                    print(f"Applied {len(applied)} operation(s) from {patch_filename}")
+                except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+                    print(f"Could not apply {patch_filename}: {e}")
+                credits = get_player_credits(data)
+                display_info(credits, factions)
+        elif choice.lower() in ('c', 's'):
+            output_filename = ask_save_filename(last_output)
+            if checkpoint is not None:
+                # One writer at a time, so saves land in the order they were
+                # taken.
+                print(f"Waiting for the save to {checkpoint.filename} to finish...")
+                checkpoint.wait()
+                report_background_save(checkpoint)
+                checkpoint = None
+            if args.backups and not source_backed_up:
+                backup_save(filename, keep=args.backups)
+                source_backed_up = True
+            save_options = {'on_done': watcher.saved if watcher else None, 'compresslevel': args.compresslevel,
+                            'threads': os.cpu_count() or 1, 'backup_keep': args.backups}
+            if watcher is not None:
+                watcher.saving(output_filename)
+            # The save is checked on the save thread; a checkpoint with
+            # problems is reported, not written, the next time round.
+            checkpoint = BackgroundSave(output_filename, data, validate_workers=os.cpu_count() or 1,
+                                        **save_options)
+            last_output = output_filename
+            if choice.lower() == 'c':
+                print(f"Checkpoint to {output_filename} is being written in the background; keep editing.")
+                continue
+            checkpoint.wait(_print_save_progress)
+            report_background_save(checkpoint)
+            if checkpoint.problems and \
+                    input("The game may not load this save. Save anyway? [y/N]: ").strip().lower() == 'y':
+                if watcher is not None:
+                    watcher.saving(output_filename)
+                checkpoint = BackgroundSave(output_filename, data, **save_options)
+                checkpoint.wait(_print_save_progress)
+                report_background_save(checkpoint)
+            if checkpoint.error is not None or checkpoint.problems:
+                # Stay in the editor so the edits can be saved elsewhere.
+                checkpoint = None
+                continue
+            if args.backups:
+                print(f"Previous versions are kept in {_backup_dir(output_filename)}")
             break
         elif choice.lower() == 'q':
+            if checkpoint is not None:
+                print(f"Waiting for the checkpoint to {checkpoint.filename} to finish...")
+                checkpoint.wait()
+                report_background_save(checkpoint)
             print("Exiting without saving.")
             break
 
@@ -0,0 +1,130 @@
+import gzip
+import importlib.util
+import json
+
+import pytest
+
+import bench_savegame
+import savegame_editor as editor
+
+
+@pytest.fixture
+def sample(tmp_path):
+    data = bench_savegame.build_sample_save(sectors=3, systems=3, pois=4, ships=4, inventory=10)
+    filename = tmp_path / 'sample.save'
+    with gzip.open(filename, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    return filename
+
+
+def _written(filename, data):
+    editor.save_savegame(str(filename), data)
+    with gzip.open(filename, 'rt', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_clean_save_is_byte_identical(sample, tmp_path):
+    with gzip.open(sample, 'rt', encoding='utf-8') as f:
+        original = f.read()
+    data = editor.load_savegame(str(sample), lazy=True)
+    assert _written(tmp_path / 'out.save', data) == original
+
+
+def test_dirty_save_matches_full_encode(sample, tmp_path):
+    data = editor.load_savegame(str(sample), lazy=True)
+    bench_savegame._apply_sample_edits(data)
+    station = editor.get_all_stations_with_materials(data)[-1]
+    editor.set_material_amount(data, station['items'][0], 777,
+                               station['path'] + ('materialStorage', 'items', 0))
+    editor.apply_patch(data, [{'op': 'add', 'path': '/Player/spaceShips/-', 'value': {'guid': 'new-ship'}}])
+
+    written = _written(tmp_path / 'out.save', data)
+    assert written == editor._encode_json(data)
+    reloaded = editor.load_savegame(str(tmp_path / 'out.save'), lazy=True)
+    assert editor.resolve_path(reloaded, station['path'] + ('materialStorage', 'items', 0, 'count')) == 777
+    assert reloaded['Player']['spaceShips'][-1] == {'guid': 'new-ship'}
+
+
+def test_non_canonical_save_is_reencoded(sample, tmp_path):
+    with gzip.open(sample, 'rt', encoding='utf-8') as f:
+        data = json.load(f)
+    pretty = tmp_path / 'pretty.save'
+    with gzip.open(pretty, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+    lazy = editor.load_savegame(str(pretty), lazy=True)
+    editor.set_player_credits(lazy, 5)
+    assert _written(tmp_path / 'out.save', lazy) == editor._encode_json(lazy)
+
+
+@pytest.mark.parametrize('backend', [name for name in editor.JSON_BACKENDS
+                                     if importlib.util.find_spec(name)])
+def test_backends_encode_like_stdlib(backend):
+    previous = editor.get_json_backend()
+    editor.set_json_backend(backend)
+    try:
+        value = {'name': 'Étoile ☆ Zône', 'big': 1e16, 'small': 1e-07, 'nan': float('nan'),
+                 'nested': [{'x': 0.1, 'n': None}], 'int': 2 ** 70}
+        assert editor._encode_json(value) == json.dumps(value, separators=(',', ':'))
+    finally:
+        editor.set_json_backend(previous)
+
+
+def test_ship_query_reaches_cargo():
+    data = bench_savegame.build_sample_save(sectors=3, systems=3, pois=4, ships=4, inventory=10)
+    changes = editor.StatQuery('ship:1 in:cargo *.multiplier*=2').plan(data)
+    assert changes
+    assert all(row.kind == 'cargo' and row.path[:5] == ('Player', 'spaceShips', 1, 'cargo', 'items')
+               for row, *_ in changes)
+
+
+def test_pooled_validation_matches_in_process(tmp_path, monkeypatch):
+    data = bench_savegame.build_sample_save(sectors=3, systems=3, pois=4, ships=4, inventory=10)
+    data['Player']['map']['sectors'][2]['systems'][0]['pointsOfInterest'][0]['guid'] = \
+        data['Player']['map']['sectors'][0]['guid']
+    filename = tmp_path / 'broken.save'
+    with gzip.open(filename, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+    lazy = editor.load_savegame(str(filename), lazy=True)
+    ship = lazy['Player']['spaceShips'][1]
+    ship['cargo']['items'][0]['count'] = -1
+    lazy['Player']['spaceShips'].mark_dirty(1)
+
+    expected = editor.validate_savegame(lazy)
+    assert len(expected) == 2
+    monkeypatch.setattr(editor, 'VALIDATION_POOL_MIN', 0)
+    assert editor.validate_savegame(lazy, workers=2) == expected
+    assert not lazy['Player']['map']['sectors'].is_loaded(2)
+
+
+def test_snapshot_ignores_later_edits(sample, tmp_path):
+    data = editor.load_savegame(str(sample), lazy=True)
+    bench_savegame._apply_sample_edits(data)
+    editor.apply_edit(data, ('Player', 'spaceShips', 1, 'cargo', 'items', 0, 'count'), 5)
+    ship = data['Player']['spaceShips'][1]
+    expected = editor._encode_json(data)
+
+    snapshot = editor.SaveSnapshot(data)
+    editor.set_player_credits(data, 1)
+    editor.apply_patch(data, [{'op': 'add', 'path': '/Player/spaceShips/0', 'value': {'guid': 'new-ship'}}])
+    editor.apply_edit(data, ('Player', 'spaceShips', 2, 'cargo', 'items', 0, 'count'), 999)
+    editor.apply_edit(data, ('Player', 'map', 'sectors', 0, 'name'), 'Renamed')
+    editor.undo_edit(data)
+    assert data['Player']['spaceShips'][2] is ship and ship['cargo']['items'][0]['count'] == 999
+
+    editor.save_savegame(str(tmp_path / 'out.save'), snapshot)
+    snapshot.release()
+    with gzip.open(tmp_path / 'out.save', 'rt', encoding='utf-8') as f:
+        assert f.read() == expected
+    editor.set_player_credits(data, 2)
+    assert editor._get_state(data)['snapshots'] == []
+
+
+def test_background_save_reports_problems(sample, tmp_path):
+    data = editor.load_savegame(str(sample), lazy=True)
+    editor.apply_edit(data, ('Player', 'spaceShips', 1, 'cargo', 'items', 0, 'count'), -1)
+    save = editor.BackgroundSave(str(tmp_path / 'out.save'), data, validate_workers=1)
+    save.wait()
+    assert save.error is None and len(save.problems) == 1
+    assert not (tmp_path / 'out.save').exists()